@@ -0,0 +1,69 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+OPERATIONS = ('hide', 'extract')
+
+def load_manifest(manifest_path: str):
+    try:
+        jobs = []
+        with open(manifest_path, newline='', encoding='utf-8') as file:
+            if os.path.splitext(manifest_path)[1].lower() == '.csv':
+                rows = csv.DictReader(file)
+            else:
+                rows = (json.loads(line) for line in file if line.strip())
+            for number, row in enumerate(rows, 1):
+                job = {key: value for key, value in row.items() if value not in (None, '')}
+                job.setdefault('id', str(number))
+                jobs.append(job)
+        return jobs
+    except Exception as e:
+        raise Exception(f"Error reading manifest: {str(e)}")
+
+def _init_worker():
+    import cv2
+    cv2.setNumThreads(1)
+
+def run_job(job: dict):
+    from steganography_tool import SteganographyTool
+    started = time.perf_counter()
+    result = {'id': job.get('id'), 'operation': job.get('operation')}
+    try:
+        tool = SteganographyTool()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if job.get('operation') == 'hide':
+                level = job.get('compression_level')
+                output = tool.hide_data_in_image(job['cover'], job['secret'], job['output'],
+                                                 bits_per_channel=int(job.get('bits_per_channel', 1)),
+                                                 compression=job.get('compression', 'none'),
+                                                 compression_level=None if level is None else int(level))
+            elif job.get('operation') == 'extract':
+                output = tool.extract_data_from_image(job['stego'], job['output'])
+            else:
+                raise Exception(f"Unknown operation {job.get('operation')!r}, expected one of {', '.join(OPERATIONS)}")
+        result.update(status='ok', output=output)
+    except KeyError as e:
+        result.update(status='error', error=f"Missing job field {e}")
+    except Exception as e:
+        result.update(status='error', error=str(e))
+    result['duration'] = round(time.perf_counter() - started, 6)
+    return result
+
+def run_batch(jobs, workers: int = None, report_file=None):
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'id': job.get('id'), 'operation': job.get('operation'),
+                          'status': 'error', 'error': f"Worker failed: {str(e)}"}
+            if report_file is not None:
+                report_file.write(json.dumps(result) + "\n")
+                report_file.flush()
+            yield result
@@ -0,0 +1,272 @@
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+
+DEFAULT_MEGAPIXELS = (0.3, 1, 5, 12, 24, 50)
+DEFAULT_PAYLOADS = ('1K', '64K', '1M', 'capacity')
+OPERATIONS = ('hide', 'extract', 'analyze')
+DEFAULT_TOLERANCE = 0.15
+SIZE_SUFFIXES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'steganography_cli.py')
+STARTUP_CASES = ('help', 'hide', 'extract', 'probe')
+STARTUP_REPEAT = 5
+HEAVY_MODULES = ('cv2', 'numpy', 'matplotlib', 'tkinter')
+GUI_MODULES = ('matplotlib', 'tkinter')
+STARTUP_FORBIDDEN = {'help': HEAVY_MODULES, 'hide': GUI_MODULES, 'extract': GUI_MODULES, 'probe': GUI_MODULES}
+STARTUP_SLOWEST = 5
+
+def parse_size(text: str):
+    text = text.strip().upper()
+    if text == 'CAPACITY':
+        return 'capacity'
+    if text[-1:] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+def _peak_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def make_cover(megapixels: float, seed: int = 0):
+    import numpy as np
+    width = max(1, int(round(math.sqrt(megapixels * 1e6 * 4 / 3))))
+    height = max(1, int(round(megapixels * 1e6 / width)))
+    x = np.linspace(0, 247, width).astype(np.uint16)
+    y = np.linspace(0, 247, height).astype(np.uint16)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:, :, 0] = x[None, :]
+    image[:, :, 1] = y[:, None]
+    image[:, :, 2] = (x[None, :] + y[:, None]) // 2
+    image += np.random.default_rng(seed).integers(0, 8, image.shape, dtype=np.uint8)
+    return image
+
+def _run_case(operation: str, cover_path: str, payload_path: str, stego_path: str, output_path: str):
+    from steganography_tool import SteganographyTool
+    tool = SteganographyTool()
+    stages = {}
+
+    def record(event):
+        if event['event'] == 'stage_end':
+            stages[event['stage']] = stages.get(event['stage'], 0.0) + event['duration']
+
+    tool.add_observer(record)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if operation == 'hide':
+            tool.hide_data_in_image(cover_path, payload_path, stego_path)
+        elif operation == 'extract':
+            tool.extract_data_from_image(stego_path, output_path)
+        else:
+            tool.analyze_images(cover_path, stego_path)
+    return {
+        'wall_time': time.perf_counter() - started,
+        'peak_rss': _peak_rss(),
+        'stages': stages
+    }
+
+def _isolated(function, *args):
+    import multiprocessing
+    with multiprocessing.get_context('spawn').Pool(processes=1, maxtasksperchild=1) as pool:
+        return pool.apply(function, args)
+
+def run_benchmarks(megapixels=DEFAULT_MEGAPIXELS, payloads=DEFAULT_PAYLOADS, operations=OPERATIONS,
+                   repeat: int = 1, work_dir: str = None, log=None):
+    import cv2
+    import tempfile
+    from steganography_tool import SteganographyTool
+    tool = SteganographyTool()
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+        for size in megapixels:
+            cover_image = make_cover(size)
+            height, width = cover_image.shape[:2]
+            cover_path = os.path.join(temp_dir, f"cover_{size}mp.png")
+            cv2.imwrite(cover_path, cover_image)
+            del cover_image
+            capacity = tool.capacity(height, width, '.bin')[1]
+            for payload in payloads:
+                payload_bytes = capacity if payload == 'capacity' else parse_size(payload)
+                if payload_bytes > capacity:
+                    continue
+                payload_path = os.path.join(temp_dir, "payload.bin")
+                with open(payload_path, 'wb') as file:
+                    for offset in range(0, payload_bytes, 1 << 20):
+                        file.write(os.urandom(min(1 << 20, payload_bytes - offset)))
+                stego_path = os.path.join(temp_dir, "stego.png")
+                output_path = os.path.join(temp_dir, "extracted.bin")
+                for operation in operations:
+                    if operation != 'hide' and not os.path.exists(stego_path):
+                        _isolated(_run_case, 'hide', cover_path, payload_path, stego_path, output_path)
+                    runs = [_isolated(_run_case, operation, cover_path, payload_path, stego_path, output_path)
+                            for _ in range(repeat)]
+                    best = min(runs, key=lambda run: run['wall_time'])
+                    image_mb = height * width * 3 / 1e6
+                    result = {
+                        'operation': operation,
+                        'megapixels': size,
+                        'width': width,
+                        'height': height,
+                        'payload': payload,
+                        'payload_bytes': payload_bytes,
+                        'wall_time': best['wall_time'],
+                        'peak_rss': max((run['peak_rss'] or 0) for run in runs) or None,
+                        'payload_mb_s': payload_bytes / 1e6 / best['wall_time'],
+                        'image_mb_s': image_mb / best['wall_time'],
+                        'stages': best['stages'],
+                        'runs': [run['wall_time'] for run in runs]
+                    }
+                    results.append(result)
+                    if log is not None:
+                        log(f"{operation:8} {size:>6} MP {payload_bytes:>12,} B  {best['wall_time']:8.3f} s  "
+                            f"{result['payload_mb_s']:8.2f} MB/s")
+                os.remove(stego_path)
+    return {'meta': environment_info(), 'results': results}
+
+def environment_info():
+    import cv2
+    import numpy as np
+    import platform
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__
+    }
+
+def parse_importtime(report: str):
+    """Total import time and per-module cumulative times, in seconds, from python -X importtime output."""
+    total, modules, top_level = 0.0, {}, []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        seconds = int(cumulative) / 1e6
+        modules[name.strip()] = seconds
+        if not name.startswith('  '):
+            total += seconds
+            top_level.append((name.strip(), seconds))
+    return total, modules, sorted(top_level, key=lambda entry: entry[1], reverse=True)
+
+def parse_budgets(text: str):
+    """Per-case import-time budgets in seconds from "help=0.08,hide=0.5"."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        case, separator, seconds = item.partition('=')
+        if not separator or case not in STARTUP_CASES:
+            raise Exception(f"Invalid startup budget {item!r}, expected CASE=SECONDS with CASE one of "
+                            f"{', '.join(STARTUP_CASES)}")
+        budgets[case] = float(seconds)
+    return budgets
+
+def _startup_commands(temp_dir: str):
+    import cv2
+    cover_path = os.path.join(temp_dir, "cover.png")
+    payload_path = os.path.join(temp_dir, "payload.txt")
+    stego_path = os.path.join(temp_dir, "stego.png")
+    cv2.imwrite(cover_path, make_cover(0.01))
+    with open(payload_path, 'w', encoding='utf-8') as file:
+        file.write("startup check\n")
+    return {
+        'help': ['--help'],
+        'hide': ['hide', cover_path, payload_path, stego_path],
+        'extract': ['extract', stego_path, os.path.join(temp_dir, "extracted")],
+        'probe': ['probe', stego_path]
+    }
+
+def measure_startup(cases=STARTUP_CASES, repeat: int = STARTUP_REPEAT, work_dir: str = None, log=None):
+    """Run small CLI commands in fresh interpreters under -X importtime, keeping the fastest run of each."""
+    import subprocess
+    import tempfile
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+        commands = _startup_commands(temp_dir)
+        for case in cases:
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                process = subprocess.run([sys.executable, '-X', 'importtime', CLI_PATH] + commands[case],
+                                         capture_output=True, text=True)
+                wall_time = time.perf_counter() - started
+                if process.returncode != 0:
+                    raise Exception(f"Startup case {case} failed: {process.stderr.strip().splitlines()[-1:]}")
+                import_time, modules, slowest = parse_importtime(process.stderr)
+                runs.append({'wall_time': wall_time, 'import_time': import_time, 'modules': modules,
+                             'slowest': slowest})
+            best = min(runs, key=lambda run: run['import_time'])
+            result = {
+                'case': case,
+                'command': " ".join(['steganography'] + [os.path.basename(arg) for arg in commands[case]]),
+                'wall_time': min(run['wall_time'] for run in runs),
+                'import_time': best['import_time'],
+                'modules': len(best['modules']),
+                'heavy': [module for module in HEAVY_MODULES if module in best['modules']],
+                'slowest': best['slowest'][:STARTUP_SLOWEST]
+            }
+            results.append(result)
+            if log is not None:
+                log(f"{case:8} imports {result['import_time'] * 1000:7.1f} ms  wall {result['wall_time'] * 1000:7.1f} ms  "
+                    f"heavy: {', '.join(result['heavy']) or '-'}")
+    return {'meta': environment_info(), 'startup': results}
+
+def check_startup(results: dict, budgets: dict = None, baseline: dict = None,
+                  tolerance: float = DEFAULT_TOLERANCE):
+    """Startup cases that load modules they should not, go over a budget or got slower than baseline."""
+    previous = {result['case']: result for result in baseline['startup']} if baseline else {}
+    failures = []
+    for result in results['startup']:
+        budget = (budgets or {}).get(result['case'])
+        if budget is not None and result['import_time'] > budget:
+            failures.append(f"{result['case']}: imports took {result['import_time'] * 1000:.1f} ms, "
+                            f"budget {budget * 1000:.0f} ms")
+        reference = previous.get(result['case'])
+        if reference and result['import_time'] > reference['import_time'] * (1 + tolerance):
+            failures.append(f"{result['case']}: imports took {result['import_time'] * 1000:.1f} ms, "
+                            f"baseline {reference['import_time'] * 1000:.1f} ms ({tolerance:.0%} allowed)")
+        forbidden = [module for module in result['heavy'] if module in STARTUP_FORBIDDEN.get(result['case'], ())]
+        if forbidden:
+            failures.append(f"{result['case']}: imported {', '.join(forbidden)}")
+    return failures
+
+def _result_key(result: dict):
+    return result['operation'], result['megapixels'], result['payload']
+
+def compare_results(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE):
+    baseline_results = {_result_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        previous = baseline_results.get(_result_key(result))
+        if previous is None:
+            continue
+        for metric in ('wall_time', 'peak_rss'):
+            if not previous.get(metric) or not result.get(metric):
+                continue
+            change = result[metric] / previous[metric] - 1
+            if change > tolerance:
+                regressions.append({
+                    'operation': result['operation'],
+                    'megapixels': result['megapixels'],
+                    'payload_bytes': result['payload_bytes'],
+                    'metric': metric,
+                    'baseline': previous[metric],
+                    'current': result[metric],
+                    'change': change
+                })
+    return regressions
+
+def load_results(path: str):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+def save_results(results: dict, path: str):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
@@ -0,0 +1,293 @@
+import argparse
+import contextlib
+import json
+import math
+import numbers
+import sys
+import steganography_bench
+
+# cv2, numpy and matplotlib are imported inside the commands that need them, so --help and the
+# bookkeeping commands start quickly; `bench --startup` checks this.
+
+def _tool():
+    from steganography_tool import SteganographyTool
+    return SteganographyTool()
+
+def cmd_hide(args):
+    from steganography_frames import is_frame_sequence
+    tool = _tool()
+    options = {'bits_per_channel': args.bits, 'compression': args.compression,
+               'compression_level': args.level}
+    if is_frame_sequence(args.cover):
+        tool.hide_data_in_frames(args.cover, args.secret, args.output, **options)
+    elif args.stream:
+        tool.hide_data_in_image_streaming(args.cover, args.secret, args.output, **options)
+    else:
+        tool.hide_data_in_image(args.cover, args.secret, args.output, **options)
+    return 0
+
+def cmd_extract(args):
+    from steganography_frames import is_frame_sequence
+    tool = _tool()
+    if is_frame_sequence(args.stego):
+        if args.offset is not None or args.length is not None:
+            raise Exception("--offset and --length are not supported for frame sequences")
+        tool.extract_data_from_frames(args.stego, args.output)
+    elif args.offset is not None or args.length is not None:
+        offset = args.offset or 0
+        data = tool.extract_range(args.stego, offset, args.length)
+        with open(args.output, 'wb') as file:
+            file.write(data)
+        print(f"Extracted {len(data):,} bytes from offset {offset:,} to {args.output}")
+    elif args.stream:
+        tool.extract_data_from_image_streaming(args.stego, args.output)
+    else:
+        tool.extract_data_from_image(args.stego, args.output)
+    return 0
+
+def _finite_json(value):
+    """Replace inf/nan (PSNR of identical images) with None, which strict JSON parsers accept."""
+    if isinstance(value, dict):
+        return {key: _finite_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_json(item) for item in value]
+    if isinstance(value, numbers.Real) and not isinstance(value, numbers.Integral):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    return value
+
+def cmd_analyze(args):
+    tool = _tool()
+    # keep stdout for the JSON result when it is requested
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+        analysis = tool.analyze_images(args.original, args.stego)
+        if args.histogram:
+            from steganography_plot import preview_image, save_analysis_figure
+            previews = [preview_image(tool.load_image(path)) for path in (args.original, args.stego)]
+            save_analysis_figure(previews, analysis, args.histogram)
+            print(f"Histogram saved as: {args.histogram}")
+    if args.json:
+        print(json.dumps(_finite_json({key: value for key, value in analysis.items() if key != 'histograms'}),
+                         indent=2, default=float, allow_nan=False))
+    return 0
+
+def cmd_batch(args):
+    from steganography_batch import load_manifest, run_batch
+    jobs = load_manifest(args.manifest)
+    report_file = open(args.report, 'w', encoding='utf-8') if args.report else sys.stdout
+    failed = 0
+    try:
+        for result in run_batch(jobs, workers=args.workers, report_file=report_file):
+            if result['status'] != 'ok':
+                failed += 1
+    finally:
+        if report_file is not sys.stdout:
+            report_file.close()
+    print(f"{len(jobs) - failed}/{len(jobs)} jobs succeeded", file=sys.stderr)
+    return 1 if failed else 0
+
+def cmd_bench(args):
+    log = lambda line: print(line, file=sys.stderr)
+    if args.startup:
+        budgets = steganography_bench.parse_budgets(args.budget or "")
+        baseline = steganography_bench.load_results(args.baseline) if args.baseline else None
+        results = steganography_bench.measure_startup(repeat=args.repeat or steganography_bench.STARTUP_REPEAT,
+                                                      work_dir=args.work_dir, log=log)
+        if args.output:
+            steganography_bench.save_results(results, args.output)
+        else:
+            print(json.dumps(results, indent=2))
+        failures = steganography_bench.check_startup(results, budgets, baseline, args.tolerance)
+        for failure in failures:
+            print(f"STARTUP {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    if args.compare:
+        results = steganography_bench.load_results(args.compare)
+    else:
+        results = steganography_bench.run_benchmarks(
+            megapixels=[float(size) for size in args.megapixels.split(',')],
+            payloads=args.payloads.split(','),
+            operations=args.operations.split(','),
+            repeat=args.repeat or 1,
+            work_dir=args.work_dir,
+            log=log
+        )
+        if args.output:
+            steganography_bench.save_results(results, args.output)
+        else:
+            print(json.dumps(results, indent=2))
+    if not args.baseline:
+        return 0
+    regressions = steganography_bench.compare_results(results, steganography_bench.load_results(args.baseline),
+                                                      args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression['operation']} {regression['megapixels']} MP "
+              f"{regression['payload_bytes']:,} B {regression['metric']}: "
+              f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({regression['change']:+.1%})",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+def cmd_probe(args):
+    from steganography_tool import SteganographyTool
+    report_file = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    total = found = 0
+    try:
+        for result in SteganographyTool().probe_paths(args.paths, workers=args.workers):
+            total += 1
+            if result.get('payload'):
+                found += 1
+            elif args.payload_only:
+                continue
+            report_file.write(json.dumps(result) + "\n")
+    finally:
+        if report_file is not sys.stdout:
+            report_file.close()
+    print(f"{total} files, {found} with payloads", file=sys.stderr)
+    return 0
+
+def cmd_scan(args):
+    from steganography_scan import scan_paths
+    report_format = args.format or ('csv' if args.output and args.output.lower().endswith('.csv') else 'jsonl')
+    report_file = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    total = suspicious = failed = 0
+    try:
+        for result in scan_paths(args.paths, workers=args.workers, report_file=report_file,
+                                 report_format=report_format):
+            total += 1
+            if result['status'] != 'ok':
+                failed += 1
+            elif result['suspicious']:
+                suspicious += 1
+    finally:
+        if report_file is not sys.stdout:
+            report_file.close()
+    print(f"{total} images, {suspicious} suspicious, {failed} failed", file=sys.stderr)
+    return 0
+
+def cmd_verify(args):
+    from steganography_tool import SteganographyTool
+    tool = SteganographyTool()
+    failed = 0
+    for path in args.images:
+        try:
+            report = tool.verify_image(path, workers=args.workers)
+        except Exception as e:
+            report = {'path': path, 'ok': False, 'error': str(e)}
+        if not report['ok']:
+            failed += 1
+        print(json.dumps(report))
+    print(f"{len(args.images) - failed}/{len(args.images)} images verified", file=sys.stderr)
+    return 1 if failed else 0
+
+def cmd_serve(args):
+    import steganography_service
+    steganography_service.run_service(port=args.port, workers=args.workers,
+                                      max_body=steganography_bench.parse_size(args.max_body),
+                                      max_queue=args.max_queue, log=lambda line: print(line, file=sys.stderr))
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="steganography", description="Hide and extract files in images")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="profile the command, writing PREFIX.prof and a PREFIX.txt report")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    hide = subparsers.add_parser("hide", help="hide a file in a cover image")
+    hide.add_argument("cover", help="cover image, PNG frame directory, multi-page TIFF or video")
+    hide.add_argument("secret", help="file to hide")
+    hide.add_argument("output", help="stego image to write (lossless format); frames go to a directory, "
+                                     ".tif/.tiff or .mkv/.avi (FFV1)")
+    hide.add_argument("-b", "--bits", type=int, default=1, help="bits per color channel, 1-4 (default 1)")
+    hide.add_argument("-c", "--compression", default="none", choices=("none", "auto", "zlib", "bz2", "lzma"),
+                      help="payload compression (default none)")
+    hide.add_argument("--level", type=int, default=None, help="compression level")
+    hide.add_argument("--stream", action="store_true",
+                      help="embed through a memory map in bands (BMP, NPY and TIFF covers only)")
+    hide.set_defaults(func=cmd_hide)
+
+    extract = subparsers.add_parser("extract", help="extract a hidden file from a stego image")
+    extract.add_argument("stego", help="stego image, PNG frame directory, multi-page TIFF or video")
+    extract.add_argument("output", help="output path, the hidden extension is appended unless a range is given")
+    extract.add_argument("--offset", type=int, default=None, help="first byte of a range to extract")
+    extract.add_argument("--length", type=int, default=None, help="number of bytes to extract from --offset")
+    extract.add_argument("--stream", action="store_true",
+                         help="read through a memory map in bands (BMP, NPY and TIFF images only)")
+    extract.set_defaults(func=cmd_extract)
+
+    analyze = subparsers.add_parser("analyze", help="compare an original image with its stego image")
+    analyze.add_argument("original", help="original cover image")
+    analyze.add_argument("stego", help="stego image")
+    analyze.add_argument("--histogram", metavar="PATH", help="save the previews and channel histograms here")
+    analyze.add_argument("--json", action="store_true", help="print the metrics as JSON, report goes to stderr")
+    analyze.set_defaults(func=cmd_analyze)
+
+    batch = subparsers.add_parser("batch", help="run hide/extract jobs from a CSV or JSONL manifest")
+    batch.add_argument("manifest", help="manifest of jobs (.csv or .jsonl)")
+    batch.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    batch.add_argument("-r", "--report", help="write the JSONL report here instead of stdout")
+    batch.set_defaults(func=cmd_batch)
+
+    bench = subparsers.add_parser("bench", help="benchmark hide/extract/analyze on synthetic images")
+    bench.add_argument("--megapixels", default=",".join(str(size) for size in steganography_bench.DEFAULT_MEGAPIXELS),
+                       help="comma-separated cover sizes in megapixels")
+    bench.add_argument("--payloads", default=",".join(steganography_bench.DEFAULT_PAYLOADS),
+                       help="comma-separated payload sizes (e.g. 1K,1M,capacity)")
+    bench.add_argument("--operations", default=",".join(steganography_bench.OPERATIONS),
+                       help="comma-separated operations to run")
+    bench.add_argument("--repeat", type=int, default=None,
+                       help="runs per case, the fastest is kept (default 1, or 5 with --startup)")
+    bench.add_argument("--work-dir", help="directory for temporary images")
+    bench.add_argument("-o", "--output", help="write results JSON here instead of stdout")
+    bench.add_argument("--baseline", help="results JSON to compare against (a --startup run for --startup), "
+                                          "exits non-zero on regressions")
+    bench.add_argument("--compare", metavar="RESULTS", help="compare an existing results JSON instead of running")
+    bench.add_argument("--startup", action="store_true",
+                       help="check CLI startup import times with -X importtime instead of running the suite")
+    bench.add_argument("--budget", metavar="CASE=SECONDS,...",
+                       help="fail --startup cases whose imports take longer, e.g. help=0.08,hide=0.5")
+    bench.add_argument("--tolerance", type=float, default=steganography_bench.DEFAULT_TOLERANCE,
+                       help="allowed slowdown before a case counts as a regression (default 0.15)")
+    bench.set_defaults(func=cmd_bench)
+
+    probe = subparsers.add_parser("probe", help="report capacity and hidden payloads without extracting")
+    probe.add_argument("paths", nargs="+", help="image files or directories to scan")
+    probe.add_argument("-w", "--workers", type=int, default=None, help="worker threads (default: CPU count)")
+    probe.add_argument("--payload-only", action="store_true", help="only report files that carry a payload")
+    probe.add_argument("-o", "--output", help="write the JSONL report here instead of stdout")
+    probe.set_defaults(func=cmd_probe)
+
+    scan = subparsers.add_parser("scan", help="score images for hidden data without the original (steganalysis)")
+    scan.add_argument("paths", nargs="+", help="image files or directories to scan")
+    scan.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    scan.add_argument("-o", "--output", help="write the report here instead of stdout")
+    scan.add_argument("--format", choices=("jsonl", "csv"),
+                      help="report format (default: csv for a .csv output, otherwise jsonl)")
+    scan.set_defaults(func=cmd_scan)
+
+    verify = subparsers.add_parser("verify", help="check hidden payloads chunk by chunk without extracting")
+    verify.add_argument("images", nargs="+", help="stego images to check")
+    verify.add_argument("-w", "--workers", type=int, default=None, help="worker threads (default: CPU count)")
+    verify.set_defaults(func=cmd_verify)
+
+    serve = subparsers.add_parser("serve", help="run the HTTP service on localhost")
+    serve.add_argument("-p", "--port", type=int, default=8080, help="port on 127.0.0.1 (default 8080)")
+    serve.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    serve.add_argument("--max-body", default="64M", help="largest accepted request body (default 64M)")
+    serve.add_argument("--max-queue", type=int, default=None,
+                       help="requests allowed to wait for a worker before answering 503 (default: 2 per worker)")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.profile:
+            from steganography_profile import profile_call
+            return profile_call(args.func, args.profile, args)
+        return args.func(args)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
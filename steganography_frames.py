@@ -0,0 +1,191 @@
+import os
+import re
+import shutil
+import cv2
+
+TIFF_EXTENSIONS = ('.tif', '.tiff')
+VIDEO_EXTENSIONS = ('.mkv', '.avi')
+LOSSLESS_FOURCC = 'FFV1'
+DEFAULT_FPS = 25.0
+FRAME_NAME = "frame_{:06d}.png"
+NUMBER = re.compile(r"(\d+)")
+
+def _numbered(name: str):
+    return [int(part) if part.isdigit() else part.lower() for part in NUMBER.split(name)]
+
+def _frame_kind(path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if os.path.isdir(path) or not ext:
+        return 'png'
+    if ext in TIFF_EXTENSIONS:
+        return 'tiff'
+    return 'video'
+
+def is_frame_sequence(path: str) -> bool:
+    """True for a PNG frame directory, a video file or a TIFF with more than one page."""
+    if os.path.isdir(path):
+        return True
+    ext = os.path.splitext(path)[1].lower()
+    if ext in VIDEO_EXTENSIONS:
+        return True
+    return ext in TIFF_EXTENSIONS and os.path.isfile(path) and cv2.imcount(path) > 1
+
+class FrameSequence:
+    """Frames of a numbered PNG directory, a multi-page TIFF or a video, decoded one at a time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.kind = _frame_kind(path)
+        self.files = []
+        self.fps = DEFAULT_FPS
+        self.position = 0
+        if self.kind == 'png':
+            if not os.path.isdir(path):
+                raise Exception(f"Frame directory {path} does not exist")
+            self.files = sorted((name for name in os.listdir(path) if name.lower().endswith('.png')), key=_numbered)
+            if not self.files:
+                raise Exception(f"No PNG frames in {path}")
+            self.count = len(self.files)
+            self.height, self.width = self._read(0).shape[:2]
+        elif self.kind == 'tiff':
+            self.count = cv2.imcount(path)
+            if not self.count:
+                raise Exception(f"Could not read pages of {os.path.basename(path)}")
+            self.height, self.width = self._read(0).shape[:2]
+        else:
+            capture = cv2.VideoCapture(path)
+            try:
+                if not capture.isOpened():
+                    raise Exception(f"Could not open video {os.path.basename(path)}")
+                self.count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+                self.width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+                self.height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                self.fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+            finally:
+                capture.release()
+
+    @property
+    def samples(self) -> int:
+        return self.count * self.height * self.width * 3
+
+    def _read(self, index: int):
+        if self.kind == 'png':
+            frame = cv2.imread(os.path.join(self.path, self.files[index]))
+        else:
+            success, pages = cv2.imreadmulti(self.path, start=index, count=1, flags=cv2.IMREAD_COLOR)
+            frame = pages[0] if success and pages else None
+        if frame is None:
+            raise Exception(f"Could not read frame {index + 1} of {os.path.basename(self.path)}")
+        return frame
+
+    def _check(self, frame, index: int):
+        if frame.shape != (self.height, self.width, 3):
+            raise Exception(f"Frame {index + 1} is {frame.shape[1]}x{frame.shape[0]}, "
+                            f"expected {self.width}x{self.height} like the first frame")
+        return frame
+
+    def frames(self):
+        """Yield BGR frames from the first one; position counts the frames handed out so far."""
+        self.position = 0
+        if self.kind != 'video':
+            while self.position < self.count:
+                self.position += 1
+                yield self._check(self._read(self.position - 1), self.position - 1)
+            return
+        capture = cv2.VideoCapture(self.path)
+        try:
+            while True:
+                success, frame = capture.read()
+                if not success:
+                    break
+                self.position += 1
+                yield self._check(frame, self.position - 1)
+        finally:
+            capture.release()
+
+    def copy_remaining(self, writer, frames):
+        """Pass the frames that frames has not yet handed out to writer, copying PNG files without decoding."""
+        if self.kind == 'png' and writer.kind == 'png':
+            for name in self.files[self.position:]:
+                writer.copy(os.path.join(self.path, name))
+            frames.close()
+            return
+        for frame in frames:
+            writer.write(frame)
+
+class FrameWriter:
+    """Write frames losslessly as numbered PNG files, TIFF pages or an FFV1 video, chosen by the output path."""
+
+    def __init__(self, path: str, sequence: FrameSequence):
+        self.path = path
+        self.kind = _frame_kind(path)
+        self.sequence = sequence
+        self.count = 0
+        self.written = []
+        self._tiff = None
+        self._video = None
+        if self.kind == 'png':
+            os.makedirs(path, exist_ok=True)
+        elif self.kind == 'tiff':
+            try:
+                import tifffile
+            except ImportError:
+                raise Exception("Writing multi-page TIFF frames requires the tifffile package")
+            self._tiff = tifffile.TiffWriter(path)
+        elif os.path.splitext(path)[1].lower() in VIDEO_EXTENSIONS:
+            # the video writer rounds odd frame sizes down to even ones, which would drop embedded rows
+            if sequence.width % 2 or sequence.height % 2:
+                raise Exception(f"Video output needs even frame sizes, write "
+                                f"{sequence.width}x{sequence.height} frames to a directory or TIFF instead")
+            self._video = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*LOSSLESS_FOURCC), sequence.fps,
+                                          (sequence.width, sequence.height))
+            if not self._video.isOpened():
+                raise Exception(f"Could not open a {LOSSLESS_FOURCC} video writer for {os.path.basename(path)}")
+        else:
+            raise Exception(f"Frame output must be a directory or use one of "
+                            f"{', '.join(TIFF_EXTENSIONS + VIDEO_EXTENSIONS)}")
+
+    def _next_png(self):
+        if self.sequence.kind == 'png' and self.count < len(self.sequence.files):
+            name = self.sequence.files[self.count]
+        else:
+            name = FRAME_NAME.format(self.count)
+        self.count += 1
+        path = os.path.join(self.path, name)
+        self.written.append(path)
+        return path
+
+    def write(self, frame):
+        if self.kind == 'png':
+            path = self._next_png()
+            if not cv2.imwrite(path, frame):
+                raise Exception(f"Could not write {os.path.basename(path)}")
+            return
+        if self._tiff is not None:
+            self._tiff.write(frame[:, :, ::-1].copy(), photometric='rgb')
+        else:
+            self._video.write(frame)
+        self.count += 1
+
+    def copy(self, source_path: str):
+        shutil.copyfile(source_path, self._next_png())
+
+    def close(self):
+        if self._tiff is not None:
+            self._tiff.close()
+            self._tiff = None
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+
+    def remove(self):
+        self.close()
+        if self.kind != 'png':
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        for path in self.written:
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.isdir(self.path) and not os.listdir(self.path):
+            os.rmdir(self.path)
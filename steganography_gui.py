@@ -1,11 +1,13 @@
+import argparse
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import threading
 import os
-from steganography_tool import SteganographyTool
-import cv2
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import queue
+from steganography_jobs import CANCELLED, DONE, FAILED, FINISHED, JobScheduler
+from steganography_scan import scan_image
+from steganography_tool import SSIM_PREVIEW_SIDE, ImageCache, SteganographyTool
+
+UI_POLL_MS = 50
 
 class SteganographyGUI:
     def __init__(self, root):
@@ -13,17 +15,27 @@ class SteganographyGUI:
         self.root.title("Steganography Tool - IKB21303 Assignment 2")
         self.root.geometry("900x900")
 
-        self.stego_tool = SteganographyTool()
+        self.image_cache = ImageCache()
+        self.stego_tool = SteganographyTool(image_cache=self.image_cache)
+        self.scheduler = JobScheduler(image_cache=self.image_cache,
+                                      listener=lambda job: self._ui(self._job_changed, job))
+        self.tab_jobs = {}
+        self.job_watches = {}
         self.cover_image_path = tk.StringVar()
         self.secret_file_path = tk.StringVar()
         self.stego_image_path = tk.StringVar()
+        self.bits_per_channel = tk.IntVar(value=1)
+        self.compression = tk.StringVar(value="auto")
         self.extract_stego_path = tk.StringVar()
         self.extract_output_path = tk.StringVar()
         self.analysis_original_path = tk.StringVar()
         self.analysis_stego_path = tk.StringVar()
         self.histogram_save_path = tk.StringVar(value="histogram_comparison.png")
+        self.ui_queue = queue.Queue()
+        self.screen_dpi = self.root.winfo_fpixels('1i')
 
         self.create_widgets()
+        self.root.after(UI_POLL_MS, self._poll_ui_queue)
 
     def create_widgets(self):
         title_label = tk.Label(self.root, text="🔒 Steganography Tool",
@@ -49,7 +61,12 @@ class SteganographyGUI:
         notebook.add(analysis_frame, text="📊 Analysis")
         self.create_analysis_tab(analysis_frame)
 
-        exit_button = ttk.Button(self.root, text="Exit", command=self.root.destroy)
+        jobs_frame = ttk.Frame(notebook)
+        notebook.add(jobs_frame, text="📋 Jobs")
+        self.create_jobs_tab(jobs_frame)
+
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        exit_button = ttk.Button(self.root, text="Exit", command=self.close)
         exit_button.pack(pady=10)
 
     def create_hide_tab(self, parent):
@@ -76,11 +93,24 @@ class SteganographyGUI:
         output_frame.pack(fill="x", padx=5, pady=5)
         ttk.Entry(output_frame, textvariable=self.stego_image_path, width=60).pack(side="left", padx=(0, 5))
         ttk.Button(output_frame, text="Browse", command=self.select_stego_output).pack(side="right")
-
-        hide_button = ttk.Button(parent, text="🔒 Hide Data in Image",
+        density_frame = ttk.Frame(output_group)
+        density_frame.pack(fill="x", padx=5, pady=5)
+        ttk.Label(density_frame, text="Bits per colour channel (higher = more capacity, lower quality):").pack(side="left", padx=(0, 5))
+        ttk.Spinbox(density_frame, from_=1, to=4, width=5, state="readonly",
+                    textvariable=self.bits_per_channel).pack(side="left")
+        compression_frame = ttk.Frame(output_group)
+        compression_frame.pack(fill="x", padx=5, pady=5)
+        ttk.Label(compression_frame, text="Compress secret file before hiding:").pack(side="left", padx=(0, 5))
+        ttk.Combobox(compression_frame, textvariable=self.compression, width=8, state="readonly",
+                     values=("auto", "none", "zlib", "bz2", "lzma")).pack(side="left")
+
+        hide_buttons = ttk.Frame(parent)
+        hide_buttons.pack(pady=20)
+        hide_button = ttk.Button(hide_buttons, text="🔒 Hide Data in Image",
                                  command=self.hide_data, style="Accent.TButton")
-        hide_button.pack(pady=20)
-        self.hide_progress = ttk.Progressbar(parent, mode='indeterminate')
+        hide_button.pack(side="left", padx=5)
+        ttk.Button(hide_buttons, text="Cancel", command=lambda: self.cancel_tab_job('hide')).pack(side="left", padx=5)
+        self.hide_progress = ttk.Progressbar(parent, mode='determinate', maximum=100)
         self.hide_progress.pack(fill="x", padx=10, pady=5)
         self.hide_status = tk.Text(parent, height=8, wrap=tk.WORD)
         self.hide_status.pack(fill="both", expand=True, padx=10, pady=10)
@@ -102,10 +132,14 @@ class SteganographyGUI:
         ttk.Entry(extract_frame, textvariable=self.extract_output_path, width=60).pack(side="left", padx=(0, 5))
         ttk.Button(extract_frame, text="Browse", command=self.select_extract_output).pack(side="right")
 
-        extract_button = ttk.Button(parent, text="🔓 Extract Hidden Data",
+        extract_buttons = ttk.Frame(parent)
+        extract_buttons.pack(pady=20)
+        extract_button = ttk.Button(extract_buttons, text="🔓 Extract Hidden Data",
                                     command=self.extract_data, style="Accent.TButton")
-        extract_button.pack(pady=20)
-        self.extract_progress = ttk.Progressbar(parent, mode='indeterminate')
+        extract_button.pack(side="left", padx=5)
+        ttk.Button(extract_buttons, text="Cancel",
+                   command=lambda: self.cancel_tab_job('extract')).pack(side="left", padx=5)
+        self.extract_progress = ttk.Progressbar(parent, mode='determinate', maximum=100)
         self.extract_progress.pack(fill="x", padx=10, pady=5)
         self.extract_status = tk.Text(parent, height=8, wrap=tk.WORD)
         self.extract_status.pack(fill="both", expand=True, padx=10, pady=10)
@@ -147,9 +181,13 @@ class SteganographyGUI:
         ttk.Entry(save_hist_frame, textvariable=self.histogram_save_path, width=40).pack(side="left", padx=(0, 5))
         ttk.Button(save_hist_frame, text="Browse Save Location", command=self.select_histogram_save_path).pack(side="right")
 
-        analyze_button = ttk.Button(scrollable_frame, text="📊 Analyze Images",
+        analyze_buttons = ttk.Frame(scrollable_frame)
+        analyze_buttons.pack(pady=10)
+        analyze_button = ttk.Button(analyze_buttons, text="📊 Analyze Images",
                                    command=self.analyze_images, style="Accent.TButton")
-        analyze_button.pack(pady=10)
+        analyze_button.pack(side="left", padx=5)
+        ttk.Button(analyze_buttons, text="🔍 Scan Stego Only",
+                   command=self.scan_stego_image).pack(side="left", padx=5)
 
         # Graph frame for histograms
         self.graph_frame = ttk.Frame(scrollable_frame)
@@ -172,6 +210,33 @@ class SteganographyGUI:
         main_canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+    def create_jobs_tab(self, parent):
+        folder_group = ttk.LabelFrame(parent, text="Process a Folder")
+        folder_group.pack(fill="x", padx=10, pady=10)
+        hide_folder_frame = ttk.Frame(folder_group)
+        hide_folder_frame.pack(fill="x", padx=5, pady=5)
+        ttk.Label(hide_folder_frame, text="Hide the secret file from the Hide Data tab in every image of a folder:"
+                  ).pack(side="left", padx=(0, 5))
+        ttk.Button(hide_folder_frame, text="Add Covers Folder", command=self.add_cover_folder).pack(side="right")
+        extract_folder_frame = ttk.Frame(folder_group)
+        extract_folder_frame.pack(fill="x", padx=5, pady=5)
+        ttk.Label(extract_folder_frame, text="Extract the hidden file from every stego image in a folder:"
+                  ).pack(side="left", padx=(0, 5))
+        ttk.Button(extract_folder_frame, text="Add Stego Folder", command=self.add_stego_folder).pack(side="right")
+
+        columns = ('ID', 'Operation', 'File', 'Status', 'Progress', 'Details')
+        self.jobs_table = ttk.Treeview(parent, columns=columns, show='headings', height=15)
+        for column, width in zip(columns, (40, 80, 200, 80, 70, 260)):
+            self.jobs_table.heading(column, text=column)
+            self.jobs_table.column(column, width=width, anchor='w')
+        self.jobs_table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        jobs_buttons = ttk.Frame(parent)
+        jobs_buttons.pack(pady=10)
+        ttk.Button(jobs_buttons, text="Cancel Selected", command=self.cancel_selected_jobs).pack(side="left", padx=5)
+        ttk.Button(jobs_buttons, text="Cancel All", command=self.scheduler.cancel_all).pack(side="left", padx=5)
+        ttk.Button(jobs_buttons, text="Clear Finished", command=self.clear_finished_jobs).pack(side="left", padx=5)
+
     def select_cover_image(self):
         filename = filedialog.askopenfilename(
             title="Select Cover Image",
@@ -242,178 +307,340 @@ class SteganographyGUI:
         if filename:
             self.histogram_save_path.set(filename)
 
+    def _ui(self, function, *args, **kwargs):
+        self.ui_queue.put((function, args, kwargs))
+
+    def _poll_ui_queue(self):
+        try:
+            while True:
+                try:
+                    function, args, kwargs = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                function(*args, **kwargs)
+        finally:
+            self.root.after(UI_POLL_MS, self._poll_ui_queue)
+
+    def _log_timings(self, status, timings):
+        status.insert(tk.END, "\nStage timings:\n")
+        for event in timings:
+            line = f"  {event['stage']:<10} {event['duration']:.3f} s"
+            if event['bytes'] is not None:
+                line += f", {event['bytes']:,} bytes"
+            if event['peak_memory'] is not None:
+                line += f", peak {event['peak_memory'] / 1048576:.1f} MiB"
+            status.insert(tk.END, line + "\n")
+
+    def _job_changed(self, job):
+        if job.status == DONE:
+            details = f"{job.duration:.2f} s"
+        else:
+            details = job.error or job.stage or ""
+        values = (job.id, job.operation, job.description, job.status, f"{job.progress:.0%}", details)
+        if self.jobs_table.exists(job.id):
+            self.jobs_table.item(job.id, values=values)
+        else:
+            self.jobs_table.insert("", "end", iid=job.id, values=values)
+        watch = self.job_watches.get(job.id)
+        if watch is None:
+            return
+        progress_bar, finished = watch
+        if progress_bar is not None:
+            progress_bar['value'] = job.progress * 100
+        if job.status in FINISHED:
+            del self.job_watches[job.id]
+            finished(job)
+
+    def _watch_job(self, tab: str, job, progress_bar, finished):
+        def finish(job):
+            self.tab_jobs.pop(tab, None)
+            finished(job)
+        self.tab_jobs[tab] = job
+        self.job_watches[job.id] = (progress_bar, finish)
+        self._job_changed(job)
+
+    def _tab_busy(self, tab: str):
+        job = self.tab_jobs.get(tab)
+        if job is not None and job.status not in FINISHED:
+            messagebox.showerror("Error", f"A {tab} job is already running. Cancel it or wait for it to finish.")
+            return True
+        return False
+
+    def cancel_tab_job(self, tab: str):
+        job = self.tab_jobs.get(tab)
+        if job is not None:
+            self.scheduler.cancel(job.id)
+
     def hide_data(self):
-        if not all([self.cover_image_path.get(), self.secret_file_path.get(), self.stego_image_path.get()]):
+        cover_path = self.cover_image_path.get()
+        secret_path = self.secret_file_path.get()
+        stego_path = self.stego_image_path.get()
+        if not all([cover_path, secret_path, stego_path]):
             messagebox.showerror("Error", "Please select all required files!")
             return
+        if self._tab_busy('hide'):
+            return
+        self.hide_progress['value'] = 0
+        self.hide_status.delete(1.0, tk.END)
+        self.hide_status.insert(tk.END, "Starting hiding process...\n")
+        try:
+            cover_size = os.path.getsize(cover_path)
+            secret_size = os.path.getsize(secret_path)
+        except OSError as e:
+            self.hide_status.insert(tk.END, f"\n❌ Error: {str(e)}\n")
+            messagebox.showerror("Error", f"Failed to hide data: {str(e)}")
+            return
+        self.hide_status.insert(tk.END, f"Cover image size: {cover_size:,} bytes\n")
+        self.hide_status.insert(tk.END, f"Secret file size: {secret_size:,} bytes\n")
 
-        def hide_thread():
-            try:
-                self.hide_progress.start()
-                self.hide_status.delete(1.0, tk.END)
-                self.hide_status.insert(tk.END, "Starting hiding process...\n")
-
-                cover_size = os.path.getsize(self.cover_image_path.get())
-                secret_size = os.path.getsize(self.secret_file_path.get())
-
-                self.hide_status.insert(tk.END, f"Cover image size: {cover_size:,} bytes\n")
-                self.hide_status.insert(tk.END, f"Secret file size: {secret_size:,} bytes\n")
-
-                self.stego_tool.hide_data_in_image(
-                    self.cover_image_path.get(),
-                    self.secret_file_path.get(),
-                    self.stego_image_path.get()
-                )
-
-                stego_size = os.path.getsize(self.stego_image_path.get())
+        def finished(job):
+            if job.status == DONE:
+                stego_size = os.path.getsize(stego_path)
                 self.hide_status.insert(tk.END, f"Stego image size: {stego_size:,} bytes\n")
                 self.hide_status.insert(tk.END, f"Size change: {stego_size - cover_size:+,} bytes\n")
+                self._log_timings(self.hide_status, job.timings)
                 self.hide_status.insert(tk.END, "\n✅ Data hidden successfully!\n")
-
-                self.hide_progress.stop()
                 messagebox.showinfo("Success", "Data hidden successfully in the image!")
-
-            except Exception as e:
-                self.hide_progress.stop()
-                self.hide_status.insert(tk.END, f"\n❌ Error: {str(e)}\n")
-                messagebox.showerror("Error", f"Failed to hide data: {str(e)}")
-
-        threading.Thread(target=hide_thread, daemon=True).start()
+            elif job.status == CANCELLED:
+                self.hide_progress['value'] = 0
+                self.hide_status.insert(tk.END, "\n⏹ Hiding cancelled\n")
+            else:
+                self.hide_progress['value'] = 0
+                self.hide_status.insert(tk.END, f"\n❌ Error: {job.error}\n")
+                messagebox.showerror("Error", f"Failed to hide data: {job.error}")
+
+        job = self.scheduler.submit('hide', {
+            'cover': cover_path,
+            'secret': secret_path,
+            'output': stego_path,
+            'bits_per_channel': self.bits_per_channel.get(),
+            'compression': self.compression.get()
+        })
+        self._watch_job('hide', job, self.hide_progress, finished)
 
     def extract_data(self):
-        if not all([self.extract_stego_path.get(), self.extract_output_path.get()]):
+        stego_path = self.extract_stego_path.get()
+        output_path = self.extract_output_path.get()
+        if not all([stego_path, output_path]):
             messagebox.showerror("Error", "Please select all required files!")
             return
+        if self._tab_busy('extract'):
+            return
+        self.extract_progress['value'] = 0
+        self.extract_status.delete(1.0, tk.END)
+        self.extract_status.insert(tk.END, "Starting extraction process...\n")
 
-        def extract_thread():
-            try:
-                self.extract_progress.start()
-                self.extract_status.delete(1.0, tk.END)
-                self.extract_status.insert(tk.END, "Starting extraction process...\n")
-
-                extracted_file = self.stego_tool.extract_data_from_image(
-                    self.extract_stego_path.get(),
-                    self.extract_output_path.get()
-                )
-
+        def finished(job):
+            if job.status == DONE:
+                extracted_file = job.result
                 extracted_size = os.path.getsize(extracted_file)
                 self.extract_status.insert(tk.END, f"Extracted file: {extracted_file}\n")
                 self.extract_status.insert(tk.END, f"Extracted file size: {extracted_size:,} bytes\n")
+                self._log_timings(self.extract_status, job.timings)
                 self.extract_status.insert(tk.END, "\n✅ Data extracted successfully!\n")
-
-                self.extract_progress.stop()
                 messagebox.showinfo("Success", f"Data extracted successfully to: {extracted_file}")
-
-            except Exception as e:
-                self.extract_progress.stop()
-                self.extract_status.insert(tk.END, f"\n❌ Error: {str(e)}\n")
-                messagebox.showerror("Error", f"Failed to extract data: {str(e)}")
-
-        threading.Thread(target=extract_thread, daemon=True).start()
+            elif job.status == CANCELLED:
+                self.extract_progress['value'] = 0
+                self.extract_status.insert(tk.END, "\n⏹ Extraction cancelled\n")
+            else:
+                self.extract_progress['value'] = 0
+                self.extract_status.insert(tk.END, f"\n❌ Error: {job.error}\n")
+                messagebox.showerror("Error", f"Failed to extract data: {job.error}")
+
+        job = self.scheduler.submit('extract', {'stego': stego_path, 'output': output_path})
+        self._watch_job('extract', job, self.extract_progress, finished)
+
+    def _save_analysis_figure(self, previews, analysis, histogram_path):
+        from steganography_plot import save_analysis_figure
+        try:
+            result = save_analysis_figure(previews, analysis, histogram_path)
+        except Exception as e:
+            result = f"Failed: {str(e)}"
+        self._ui(self.analysis_table.item, 'histogram', values=("Histogram Saved", "", "", result))
+
+    def _analysis_rows(self, analysis):
+        psnr = analysis['psnr']
+        mse = analysis['mse']
+        original_size = analysis['original_size']
+        stego_size = analysis['stego_size']
+        size_diff = stego_size - original_size
+        size_change_pct = (size_diff / original_size) * 100
+        if psnr > 30:
+            quality = "Excellent (visually identical)"
+        elif psnr > 20:
+            quality = "Good (minimal visible difference)"
+        else:
+            quality = "Poor (visible differences)"
+
+        comparison_rows = [
+            ("Image Size (bytes)", f"{original_size:,}", f"{stego_size:,}", f"{size_diff:+,}"),
+            ("Size Change (%)", "", "", f"{size_change_pct:+.2f}%"),
+            ("MSE (Mean Squared Error)", f"{mse:.4f}", "", ""),
+            ("PSNR (dB)", f"{psnr:.2f}", "", ""),
+            ("SSIM", f"{analysis['ssim']:.6f}", "",
+             f"preview, 1 in {analysis['ssim_stride']} rows and columns" if analysis['ssim_stride'] > 1 else ""),
+            ("Changed LSBs", f"{analysis['changed_lsbs']:,}", "", ""),
+        ]
+        comparison_rows += [
+            (f"{channel['channel'].capitalize()} Channel", "", "",
+             f"MSE {channel['mse']:.4f}, PSNR {channel['psnr']:.2f} dB, SSIM {channel['ssim']:.6f}")
+            for channel in analysis['channels']
+        ]
+        comparison_rows.append(("Quality", "", "", quality))
+        cache = self.image_cache.stats()
+        comparison_rows.append(("Image Cache", f"{cache['hits']} hits", f"{cache['misses']} misses",
+                                f"{cache['bytes'] / 1048576:.0f} of {cache['max_bytes'] / 1048576:.0f} MiB used"))
+        return comparison_rows
+
+    def _show_analysis(self, fig, comparison_rows):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        for row in comparison_rows:
+            self.analysis_table.insert("", "end", values=row)
+        self.analysis_table.insert("", "end", iid='histogram', values=("Histogram Saved", "", "", "Saving..."))
+
+        messagebox.showinfo("Analysis Complete", "Image analysis completed successfully!")
 
     def analyze_images(self):
-        if not all([self.analysis_original_path.get(), self.analysis_stego_path.get()]):
+        original_path = self.analysis_original_path.get()
+        stego_path = self.analysis_stego_path.get()
+        histogram_path = self.histogram_save_path.get()
+        if not all([original_path, stego_path]):
             messagebox.showerror("Error", "Please select both images to analyze!")
             return
-
-        def analyze_thread():
-            try:
-                for widget in self.graph_frame.winfo_children():
-                    widget.destroy()
-
-                analysis = self.stego_tool.analyze_images(
-                    self.analysis_original_path.get(),
-                    self.analysis_stego_path.get()
-                )
-
-                original = cv2.imread(self.analysis_original_path.get())
-                stego = cv2.imread(self.analysis_stego_path.get())
-
-                if len(original.shape) == 2:
-                    original = cv2.cvtColor(original, cv2.COLOR_GRAY2BGR)
-                if len(stego.shape) == 2:
-                    stego = cv2.cvtColor(stego, cv2.COLOR_GRAY2BGR)
-                if original.shape[2] > 3:
-                    original = original[:, :, :3]
-                if stego.shape[2] > 3:
-                    stego = stego[:, :, :3]
-
-                original_rgb = cv2.cvtColor(original, cv2.COLOR_BGR2RGB)
-                stego_rgb = cv2.cvtColor(stego, cv2.COLOR_BGR2RGB)
-
-                fig, axes = plt.subplots(2, 4, figsize=(16, 8))
-                axes[0, 0].imshow(original_rgb)
-                axes[0, 0].set_title('Original Image')
-                axes[0, 0].axis('off')
-                axes[1, 0].imshow(stego_rgb)
-                axes[1, 0].set_title('Stego Image')
-                axes[1, 0].axis('off')
-
-                colors = ['red', 'green', 'blue']
-                for i, color in enumerate(colors):
-                    hist_orig = cv2.calcHist([original], [i], None, [256], [0, 256])
-                    axes[0, i + 1].plot(hist_orig, color=color)
-                    axes[0, i + 1].set_title(f'Original - {color.capitalize()} Channel')
-                    axes[0, i + 1].set_xlim([0, 256])
-
-                    hist_stego = cv2.calcHist([stego], [i], None, [256], [0, 256])
-                    axes[1, i + 1].plot(hist_stego, color=color)
-                    axes[1, i + 1].set_title(f'Stego - {color.capitalize()} Channel')
-                    axes[1, i + 1].set_xlim([0, 256])
-
-                axes[0, 3].axis('off')
-                axes[1, 3].axis('off')
-
-                plt.tight_layout()
-                histogram_path = self.histogram_save_path.get()
-                plt.savefig(histogram_path, dpi=300, bbox_inches='tight')
-
-                canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
-                canvas.draw()
-                canvas.get_tk_widget().pack(fill="both", expand=True)
-                plt.close(fig)
-
-                psnr = analysis['psnr']
-                mse = analysis['mse']
-                original_size = analysis['original_size']
-                stego_size = analysis['stego_size']
-                size_diff = stego_size - original_size
-                size_change_pct = (size_diff / original_size) * 100
-                if psnr > 30:
-                    quality = "Excellent (visually identical)"
-                elif psnr > 20:
-                    quality = "Good (minimal visible difference)"
-                else:
-                    quality = "Poor (visible differences)"
-
-                for item in self.analysis_table.get_children():
-                    self.analysis_table.delete(item)
-
-                comparison_rows = [
-                    ("Image Size (bytes)", f"{original_size:,}", f"{stego_size:,}", f"{size_diff:+,}"),
-                    ("Size Change (%)", "", "", f"{size_change_pct:+.2f}%"),
-                    ("MSE (Mean Squared Error)", f"{mse:.4f}", "", ""),
-                    ("PSNR (dB)", f"{psnr:.2f}", "", ""),
-                    ("Quality", "", "", quality),
-                    ("Histogram Saved", "", "", histogram_path),
-                ]
-                for row in comparison_rows:
-                    self.analysis_table.insert("", "end", values=row)
-
-                messagebox.showinfo("Analysis Complete", "Image analysis completed successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to analyze images: {str(e)}")
-
-        threading.Thread(target=analyze_thread, daemon=True).start()
-
-def main():
+        if self._tab_busy('analyze'):
+            return
+        for widget in self.graph_frame.winfo_children():
+            widget.destroy()
+        for item in self.analysis_table.get_children():
+            self.analysis_table.delete(item)
+
+        def render(analysis):
+            # matplotlib is only imported once the first analysis needs a figure
+            from steganography_plot import build_analysis_figure, preview_image
+            previews = [preview_image(self.stego_tool.load_image(path)) for path in (original_path, stego_path)]
+            fig = build_analysis_figure(previews, analysis, self.screen_dpi)
+            return analysis, previews, fig, self._analysis_rows(analysis)
+
+        def finished(job):
+            if job.status != DONE:
+                if job.status == FAILED:
+                    messagebox.showerror("Error", f"Failed to analyze images: {job.error}")
+                return
+            analysis, previews, fig, rows = job.result
+            self._show_analysis(fig, rows)
+            self.scheduler.submit_call(f"Save {os.path.basename(histogram_path)}", self._save_analysis_figure,
+                                       previews, analysis, histogram_path)
+
+        # full-resolution SSIM takes seconds on large covers; the strided preview keeps the tab interactive
+        job = self.scheduler.submit('analyze', {'original': original_path, 'stego': stego_path,
+                                                'ssim_max_side': SSIM_PREVIEW_SIDE},
+                                    description=os.path.basename(stego_path), postprocess=render)
+        self._watch_job('analyze', job, None, finished)
+
+    def _scan_rows(self, scan):
+        verdict = "Suspicious (likely hidden data)" if scan['suspicious'] else "No LSB embedding detected"
+        rows = [
+            ("Image Size (pixels)", "", f"{scan['width']} x {scan['height']}", ""),
+            ("RS Estimate", "", f"{scan['rs_estimate']:.1%}", "of samples carry message bits"),
+            ("Chi-square p", "", f"{scan['chi_square_p']:.4f}",
+             f"first {scan['chi_square_extent']:.0%} of the image looks embedded"),
+            ("LSB Entropy", "", f"{scan['lsb_entropy']:.4f}", "bits per sample"),
+        ]
+        rows += [
+            (f"{channel['channel'].capitalize()} Channel", "", f"RS {channel['rs_estimate']:.1%}",
+             f"chi-square p {channel['chi_square_p']:.4f}, LSB ones {channel['lsb_ones']:.3f}")
+            for channel in scan['channels']
+        ]
+        rows.append(("Verdict", "", "", verdict))
+        return rows
+
+    def scan_stego_image(self):
+        stego_path = self.analysis_stego_path.get()
+        if not stego_path:
+            messagebox.showerror("Error", "Please select the stego image to scan!")
+            return
+        if self._tab_busy('analyze'):
+            return
+        for widget in self.graph_frame.winfo_children():
+            widget.destroy()
+        for item in self.analysis_table.get_children():
+            self.analysis_table.delete(item)
+
+        def finished(job):
+            if job.status != DONE:
+                if job.status == FAILED:
+                    messagebox.showerror("Error", f"Failed to scan image: {job.error}")
+                return
+            scan = job.result
+            if scan['status'] != 'ok':
+                messagebox.showerror("Error", f"Failed to scan image: {scan['error']}")
+                return
+            for row in self._scan_rows(scan):
+                self.analysis_table.insert("", "end", values=row)
+
+        job = self.scheduler.submit_call(f"Scan {os.path.basename(stego_path)}", scan_image, stego_path)
+        self._watch_job('analyze', job, None, finished)
+
+    def add_cover_folder(self):
+        secret_path = self.secret_file_path.get()
+        if not secret_path:
+            messagebox.showerror("Error", "Select the secret file on the Hide Data tab first!")
+            return
+        folder = filedialog.askdirectory(title="Select Folder of Cover Images")
+        if not folder:
+            return
+        output_dir = filedialog.askdirectory(title="Select Folder for Stego Images")
+        if not output_dir:
+            return
+        jobs = self.scheduler.hide_folder(folder, secret_path, output_dir,
+                                          bits_per_channel=self.bits_per_channel.get(),
+                                          compression=self.compression.get())
+        if not jobs:
+            messagebox.showinfo("Jobs", "No images found in that folder.")
+
+    def add_stego_folder(self):
+        folder = filedialog.askdirectory(title="Select Folder of Stego Images")
+        if not folder:
+            return
+        output_dir = filedialog.askdirectory(title="Select Folder for Extracted Files")
+        if not output_dir:
+            return
+        if not self.scheduler.extract_folder(folder, output_dir):
+            messagebox.showinfo("Jobs", "No stego images found in that folder.")
+
+    def cancel_selected_jobs(self):
+        for item in self.jobs_table.selection():
+            self.scheduler.cancel(int(item))
+
+    def clear_finished_jobs(self):
+        for job_id in self.scheduler.clear_finished():
+            if self.jobs_table.exists(job_id):
+                self.jobs_table.delete(job_id)
+
+    def close(self):
+        self.scheduler.shutdown()
+        self.root.destroy()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Steganography Tool GUI")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="profile the session, writing PREFIX.prof and a PREFIX.txt report")
+    args = parser.parse_args(argv)
     root = tk.Tk()
     app = SteganographyGUI(root)
     root.update_idletasks()
     x = (root.winfo_screenwidth() // 2) - (root.winfo_width() // 2)
     y = (root.winfo_screenheight() // 2) - (root.winfo_height() // 2)
     root.geometry(f"+{x}+{y}")
-    root.mainloop()
+    if args.profile:
+        from steganography_profile import profile_call
+        profile_call(root.mainloop, args.profile)
+    else:
+        root.mainloop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,188 @@
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from steganography_tool import SteganographyTool
+
+STAGES = {
+    'hide': ('serialize', 'decode', 'embed', 'encode'),
+    'extract': ('decode', 'extract'),
+    'analyze': ('decode', 'metrics')
+}
+COVER_EXTENSIONS = ('.png', '.bmp', '.tif', '.tiff', '.jpg', '.jpeg', '.webp')
+STEGO_EXTENSIONS = ('.png', '.bmp', '.tif', '.tiff')
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+def default_workers():
+    return max(1, min(4, (os.cpu_count() or 1) // 2))
+
+def _hide(tool, params: dict):
+    return tool.hide_data_in_image(params['cover'], params['secret'], params['output'],
+                                   bits_per_channel=params.get('bits_per_channel', 1),
+                                   compression=params.get('compression', 'none'),
+                                   compression_level=params.get('compression_level'))
+
+def _extract(tool, params: dict):
+    return tool.extract_data_from_image(params['stego'], params['output'])
+
+def _analyze(tool, params: dict):
+    return tool.analyze_images(params['original'], params['stego'], ssim_max_side=params.get('ssim_max_side'))
+
+OPERATIONS = {'hide': _hide, 'extract': _extract, 'analyze': _analyze}
+
+def list_images(folder: str, extensions):
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if os.path.splitext(name)[1].lower() in extensions and os.path.isfile(os.path.join(folder, name))]
+
+class Job:
+    def __init__(self, job_id: int, operation: str, description: str, run):
+        self.id = job_id
+        self.operation = operation
+        self.description = description
+        self.status = QUEUED
+        self.stage = None
+        self.progress = 0.0
+        self.timings = []
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._run = run
+
+    @property
+    def duration(self):
+        if self.started is None:
+            return None
+        return (self.finished or time.perf_counter()) - self.started
+
+class JobScheduler:
+    """Runs hide/extract/analyze jobs on a bounded thread pool with per-job progress and cancellation.
+
+    listener(job) is called from worker threads whenever a job changes state or reports progress.
+    """
+
+    def __init__(self, workers: int = None, image_cache=None, listener=None):
+        self.image_cache = image_cache
+        self.listener = listener
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers or default_workers(),
+                                            thread_name_prefix="steganography-job")
+
+    def _notify(self, job: Job):
+        if self.listener is not None:
+            self.listener(job)
+
+    def submit(self, operation: str, params: dict, description: str = None, postprocess=None):
+        """Queue an operation from OPERATIONS; postprocess(result) runs on the worker afterwards."""
+        if operation not in OPERATIONS:
+            raise Exception(f"Unknown operation {operation!r}, expected one of {', '.join(OPERATIONS)}")
+
+        def run(job):
+            tool = SteganographyTool(image_cache=self.image_cache, cancel_event=job.cancel_event)
+            tool.add_observer(lambda event: self._on_event(job, event))
+            result = OPERATIONS[operation](tool, params)
+            return postprocess(result) if postprocess is not None else result
+
+        if description is None:
+            description = os.path.basename(params.get('cover') or params.get('stego') or '')
+        return self._enqueue(operation, description, run)
+
+    def submit_call(self, description: str, function, *args):
+        return self._enqueue('call', description, lambda job: function(*args))
+
+    def hide_folder(self, folder: str, secret_path: str, output_dir: str, **options):
+        jobs = []
+        for path in list_images(folder, COVER_EXTENSIONS):
+            name = os.path.splitext(os.path.basename(path))[0]
+            output = os.path.join(output_dir, f"{name}_stego.png")
+            jobs.append(self.submit('hide', dict(options, cover=path, secret=secret_path, output=output)))
+        return jobs
+
+    def extract_folder(self, folder: str, output_dir: str):
+        jobs = []
+        for path in list_images(folder, STEGO_EXTENSIONS):
+            output = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0])
+            jobs.append(self.submit('extract', {'stego': path, 'output': output}))
+        return jobs
+
+    def _enqueue(self, operation: str, description: str, run):
+        with self._lock:
+            job = Job(next(self._ids), operation, description, run)
+            self.jobs[job.id] = job
+        self._notify(job)
+        job.future = self._executor.submit(self._execute, job)
+        return job
+
+    def _execute(self, job: Job):
+        if job.cancel_event.is_set():
+            job.status = CANCELLED
+            job.error = "Cancelled"
+            self._notify(job)
+            return
+        job.status = RUNNING
+        job.started = time.perf_counter()
+        self._notify(job)
+        try:
+            job.result = job._run(job)
+            job.status = DONE
+            job.progress = 1.0
+        except Exception as e:
+            if job.cancel_event.is_set():
+                job.status = CANCELLED
+                job.error = "Cancelled"
+            else:
+                job.status = FAILED
+                job.error = str(e)
+        job.finished = time.perf_counter()
+        self._notify(job)
+
+    def _on_event(self, job: Job, event: dict):
+        stages = STAGES[job.operation]
+        if event['stage'] not in stages:
+            return
+        share = 1.0 / len(stages)
+        start = stages.index(event['stage']) * share
+        if event['event'] == 'stage_start':
+            job.stage = event['stage']
+        elif event['event'] == 'progress':
+            job.progress = start + event['fraction'] * share
+        elif event['event'] == 'stage_end':
+            job.progress = start + share
+            job.timings.append(event)
+        self._notify(job)
+
+    def cancel(self, job_id: int):
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINISHED:
+            return False
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.status = CANCELLED
+            job.error = "Cancelled"
+            self._notify(job)
+        return True
+
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def clear_finished(self):
+        with self._lock:
+            finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED]
+            for job_id in finished:
+                del self.jobs[job_id]
+        return finished
+
+    def shutdown(self, wait: bool = False):
+        self.cancel_all()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,50 @@
+import cv2
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+PREVIEW_MAX_SIDE = 512
+SAVE_DPI = 300
+
+def preview_image(image, max_side: int = PREVIEW_MAX_SIDE):
+    """Downscale a BGR image for display, striding first so huge images are never resized in full."""
+    step = max(1, max(image.shape[:2]) // (2 * max_side))
+    image = image[::step, ::step]
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale < 1:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+def build_analysis_figure(previews, analysis, dpi):
+    fig = Figure(figsize=(16, 8), dpi=dpi)
+    axes = fig.subplots(2, 4)
+    for row, (preview, title) in enumerate(zip(previews, ('Original Image', 'Stego Image'))):
+        axes[row, 0].imshow(preview)
+        axes[row, 0].set_title(title)
+        axes[row, 0].axis('off')
+
+    histograms = analysis['histograms']
+    for i, channel in enumerate(analysis['channels'][:3]):
+        color = channel['channel']
+        if color == 'gray':
+            color = 'black'
+        axes[0, i + 1].plot(histograms['original'][i], color=color)
+        axes[0, i + 1].set_title(f"Original - {channel['channel'].capitalize()} Channel")
+        axes[0, i + 1].set_xlim([0, 256])
+
+        axes[1, i + 1].plot(histograms['stego'][i], color=color)
+        axes[1, i + 1].set_title(f"Stego - {channel['channel'].capitalize()} Channel")
+        axes[1, i + 1].set_xlim([0, 256])
+    for i in range(len(analysis['channels'][:3]) + 1, 4):
+        axes[0, i].axis('off')
+        axes[1, i].axis('off')
+
+    fig.tight_layout()
+    return fig
+
+def save_analysis_figure(previews, analysis, histogram_path: str, dpi: int = SAVE_DPI):
+    fig = build_analysis_figure(previews, analysis, dpi)
+    FigureCanvasAgg(fig)
+    fig.savefig(histogram_path, dpi=dpi, bbox_inches='tight')
+    return histogram_path
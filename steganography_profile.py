@@ -0,0 +1,36 @@
+import cProfile
+import io
+import pstats
+import tracemalloc
+
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+def profile_call(function, report_prefix: str, *args, **kwargs):
+    """Run function under cProfile and tracemalloc, writing PREFIX.prof and PREFIX.txt."""
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        profiler.dump_stats(f"{report_prefix}.prof")
+        write_report(profiler, snapshot, peak, f"{report_prefix}.txt")
+
+def write_report(profiler, snapshot, peak: int, report_path: str):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    with open(report_path, 'w', encoding='utf-8') as file:
+        file.write(f"Peak traced memory: {peak / 1048576:.1f} MiB\n\n")
+        file.write(f"Top {TOP_FUNCTIONS} functions by cumulative time\n")
+        file.write(stream.getvalue())
+        file.write(f"\nTop {TOP_ALLOCATIONS} live allocations by line\n")
+        for statistic in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+            file.write(f"{statistic}\n")
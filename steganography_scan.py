@@ -0,0 +1,159 @@
+import csv
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from steganography_tool import CHANNEL_NAMES, iter_image_files
+
+SCAN_EXTENSIONS = ('.png', '.bmp', '.tif', '.tiff', '.webp', '.ppm', '.pgm', '.pnm')
+CHI_SEGMENTS = 20
+CHI_MIN_EXPECTED = 5
+CHI_THRESHOLD = 0.95
+RS_GROUP_SIZE = 4
+FLIP_POSITIVE = np.arange(256, dtype=np.int16) ^ 1
+FLIP_NEGATIVE = ((np.arange(256, dtype=np.int16) + 1) ^ 1) - 1
+RS_THRESHOLD = 0.1
+SCAN_CHUNKSIZE = 4
+REPORT_FIELDS = ('path', 'status', 'width', 'height', 'rs_estimate', 'chi_square_p', 'chi_square_extent',
+                 'lsb_entropy', 'suspicious', 'duration', 'error')
+
+def chi2_sf(statistic: np.ndarray, dof: np.ndarray) -> np.ndarray:
+    """Chi-square survival function via the Wilson-Hilferty normal approximation."""
+    dof = np.maximum(dof, 1).astype(np.float64)
+    z = (np.cbrt(statistic / dof) - (1 - 2 / (9 * dof))) / np.sqrt(2 / (9 * dof))
+    return 0.5 * np.vectorize(math.erfc)(z / math.sqrt(2))
+
+def chi_square_attack(values: np.ndarray, segments: int = CHI_SEGMENTS):
+    """Westfeld-Pfitzmann attack on growing prefixes of the samples.
+
+    Returns the statistic and embedding probability over all samples, plus the fraction of samples from the
+    start that look embedded, which is how this tool fills a cover.
+    """
+    counts = np.stack([np.bincount(part, minlength=256) for part in np.array_split(values, segments)])
+    pairs = np.cumsum(counts, axis=0).reshape(segments, 128, 2)
+    expected = pairs.sum(axis=2) / 2
+    valid = expected > CHI_MIN_EXPECTED
+    terms = np.divide((pairs[:, :, 0] - expected) ** 2, expected, out=np.zeros_like(expected), where=valid)
+    statistic = terms.sum(axis=1)
+    probability = chi2_sf(statistic, valid.sum(axis=1) - 1)
+    embedded = np.cumprod(probability > CHI_THRESHOLD)
+    return float(statistic[-1]), float(probability[-1]), float(embedded.sum() / segments)
+
+def _regular_singular(columns):
+    """Fractions of regular and singular groups under the mask M = [0, 1, 1, 0] and its negation -M.
+
+    Only the two middle samples of a group are flipped, so the groups are handled as four columns and
+    the flips are table lookups.
+    """
+    first, second, third, fourth = columns
+    original = np.abs(second - first) + np.abs(third - second) + np.abs(fourth - third)
+    fractions = []
+    for flip in (FLIP_POSITIVE, FLIP_NEGATIVE):
+        second_flipped, third_flipped = flip[second], flip[third]
+        flipped = (np.abs(second_flipped - first) + np.abs(third_flipped - second_flipped)
+                   + np.abs(fourth - third_flipped))
+        fractions += [np.count_nonzero(flipped > original) / original.size,
+                      np.count_nonzero(flipped < original) / original.size]
+    return fractions
+
+def rs_analysis(channel: np.ndarray) -> float:
+    """Fridrich's RS estimate of the fraction of samples carrying message bits (0 to 1)."""
+    width = channel.shape[1] // RS_GROUP_SIZE * RS_GROUP_SIZE
+    if not width or not channel.shape[0]:
+        return 0.0
+    groups = channel[:, :width].reshape(-1, RS_GROUP_SIZE)
+    columns = [groups[:, index].astype(np.int16) for index in range(RS_GROUP_SIZE)]
+    r_m, s_m, r_neg, s_neg = _regular_singular(columns)
+    r_m1, s_m1, r_neg1, s_neg1 = _regular_singular([column ^ 1 for column in columns])
+    d0, d1 = r_m - s_m, r_m1 - s_m1
+    d_neg0, d_neg1 = r_neg - s_neg, r_neg1 - s_neg1
+    a = 2 * (d1 + d0)
+    b = d_neg0 - d_neg1 - d1 - 3 * d0
+    c = d0 - d_neg0
+    if abs(a) < 1e-12:
+        roots = [-c / b] if abs(b) > 1e-12 else []
+    else:
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return 0.0
+        roots = [(-b + sign * math.sqrt(discriminant)) / (2 * a) for sign in (1, -1)]
+    if not roots:
+        return 0.0
+    x = min(roots, key=abs)
+    if abs(x - 0.5) < 1e-12:
+        return 1.0
+    return float(min(1.0, max(0.0, x / (x - 0.5))))
+
+def lsb_plane_stats(values: np.ndarray):
+    """Fraction of set LSBs and the entropy of the LSB plane in 8-sample blocks, in bits per sample."""
+    bits = values & 1
+    counts = np.bincount(np.packbits(bits), minlength=256)
+    probabilities = counts[counts > 0] / counts.sum() if counts.sum() else np.ones(1)
+    return float(bits.mean()) if bits.size else 0.0, float(-(probabilities * np.log2(probabilities)).sum() / 8)
+
+def analyze_image(image: np.ndarray):
+    """Per-channel chi-square, RS and LSB-plane statistics for an 8-bit image, with image-level scores."""
+    if image.dtype != np.uint8:
+        raise Exception(f"Only 8-bit images can be scanned, got {image.dtype}")
+    if image.ndim == 2:
+        image = image[:, :, None]
+    names = CHANNEL_NAMES.get(image.shape[2], tuple(f"channel{index}" for index in range(image.shape[2])))
+    channels = []
+    for index, name in enumerate(names):
+        channel = np.ascontiguousarray(image[:, :, index])
+        values = channel.reshape(-1)
+        statistic, probability, extent = chi_square_attack(values)
+        ones, entropy = lsb_plane_stats(values)
+        channels.append({'channel': name, 'chi_square': statistic, 'chi_square_p': probability,
+                         'chi_square_extent': extent, 'rs_estimate': rs_analysis(channel),
+                         'lsb_ones': ones, 'lsb_entropy': entropy})
+    color = [channel for channel in channels if channel['channel'] != 'alpha'] or channels
+    result = {
+        'width': image.shape[1],
+        'height': image.shape[0],
+        'rs_estimate': float(np.mean([channel['rs_estimate'] for channel in color])),
+        'chi_square_p': max(channel['chi_square_p'] for channel in color),
+        'chi_square_extent': max(channel['chi_square_extent'] for channel in color),
+        'lsb_entropy': float(np.mean([channel['lsb_entropy'] for channel in color])),
+        'channels': channels
+    }
+    result['suspicious'] = result['rs_estimate'] >= RS_THRESHOLD or result['chi_square_p'] >= CHI_THRESHOLD
+    return result
+
+def _init_worker():
+    cv2.setNumThreads(1)
+
+def scan_image(path: str):
+    started = time.perf_counter()
+    result = {'path': path}
+    try:
+        image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if image is None:
+            raise Exception(f"Could not load image {os.path.basename(path)}")
+        result.update(status='ok', **analyze_image(image))
+    except Exception as e:
+        result.update(status='error', error=str(e))
+    result['duration'] = round(time.perf_counter() - started, 6)
+    return result
+
+def scan_paths(paths, workers: int = None, report_file=None, report_format: str = 'jsonl'):
+    """Scan image files and image folders over a process pool, yielding results in order.
+
+    When report_file is given each result is written to it as a JSONL line or a CSV row.
+    """
+    writer = None
+    if report_file is not None and report_format == 'csv':
+        writer = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for result in executor.map(scan_image, iter_image_files(paths, SCAN_EXTENSIONS), chunksize=SCAN_CHUNKSIZE):
+            if writer is not None:
+                writer.writerow(result)
+            elif report_file is not None:
+                report_file.write(json.dumps(result) + "\n")
+            if report_file is not None:
+                report_file.flush()
+            yield result
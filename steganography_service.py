@@ -0,0 +1,324 @@
+import asyncio
+import bisect
+import json
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+from steganography_batch import _init_worker
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BODY = 64 << 20
+MAX_HEADER_LINES = 100
+QUEUE_PER_WORKER = 2
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+           413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+HIDE_OPTIONS = {'format': str, 'level': int, 'bits_per_channel': int, 'compression': str, 'compression_level': int}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+_tool = None
+
+def _worker_tool():
+    global _tool
+    if _tool is None:
+        from steganography_tool import SteganographyTool
+        _tool = SteganographyTool()
+    return _tool
+
+def _finite(value: float):
+    return value if math.isfinite(value) else None
+
+def _hide(cover: bytes, payload: bytes, file_ext: str, options: dict):
+    options = dict(options)
+    image_format = options.pop('format', '.png')
+    return bytes(_worker_tool().hide_bytes(cover, payload, file_ext, image_format, **options))
+
+def _extract(stego: bytes):
+    return _worker_tool().extract_bytes(stego)
+
+def _analyze(original: bytes, stego: bytes):
+    tool = _worker_tool()
+    metrics = tool.compute_quality_metrics(tool.decode_image(original), tool.decode_image(stego))
+    metrics['psnr'] = _finite(metrics['psnr'])
+    for channel in metrics['channels']:
+        channel['psnr'] = _finite(channel['psnr'])
+    metrics['histograms'] = {name: values.tolist() for name, values in metrics['histograms'].items()}
+    metrics.update(original_size=len(original), stego_size=len(stego))
+    return metrics
+
+def _dimensions(image: bytes):
+    return _worker_tool().decode_image(image).shape[:2]
+
+def parse_multipart(body: bytes, content_type: str):
+    """Split a multipart/form-data body into {name: (filename, data)}."""
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not content_type.startswith('multipart/form-data') or not match:
+        raise HTTPError(400, "Expected a multipart/form-data body")
+    delimiter = b"--" + match.group(1).encode('latin-1')
+    parts = {}
+    position = body.find(delimiter)
+    while position != -1:
+        start = position + len(delimiter)
+        if body[start:start + 2] == b"--":
+            break
+        header_end = body.find(b"\r\n\r\n", start)
+        end = body.find(b"\r\n" + delimiter, header_end)
+        if header_end == -1 or end == -1:
+            raise HTTPError(400, "Malformed multipart body")
+        part_headers = body[start:header_end].decode('latin-1')
+        name = re.search(r'\bname="([^"]*)"', part_headers)
+        filename = re.search(r'\bfilename="([^"]*)"', part_headers)
+        if name:
+            parts[name.group(1)] = (filename.group(1) if filename else None, body[header_end + 4:end])
+        position = end + 2
+    return parts
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+class SteganographyService:
+    """Asyncio HTTP front end that runs the CPU-bound work on a process pool.
+
+    POST /hide      multipart fields cover and payload, query format/level/bits_per_channel/compression
+    POST /extract   raw stego image body, returns the hidden file with an X-File-Extension header
+    POST /analyze   multipart fields original and stego, returns quality metrics as JSON
+    POST /capacity  raw cover image body, returns the capacity at each density as JSON
+    GET  /metrics   latency histograms, response counts and queue depth in Prometheus text format
+    """
+
+    def __init__(self, workers: int = None, max_body: int = DEFAULT_MAX_BODY, max_queue: int = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_body = max_body
+        self.max_queue = self.workers * QUEUE_PER_WORKER if max_queue is None else max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self.latency = {}
+        self.responses = {}
+        self.routes = {
+            '/hide': ('POST', self.handle_hide),
+            '/extract': ('POST', self.handle_extract),
+            '/analyze': ('POST', self.handle_analyze),
+            '/capacity': ('POST', self.handle_capacity),
+            '/metrics': ('GET', self.handle_metrics)
+        }
+        self.executor = None
+
+    async def run_in_pool(self, function, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPError(503, "Server busy, retry later")
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        except BrokenProcessPool:
+            raise HTTPError(500, "Worker process crashed")
+        except Exception as e:
+            raise HTTPError(400, str(e))
+        finally:
+            self.in_flight -= 1
+
+    async def handle_hide(self, query: dict, headers: dict, body: bytes):
+        parts = parse_multipart(body, headers.get('content-type', ''))
+        if 'cover' not in parts or 'payload' not in parts:
+            raise HTTPError(400, "Fields 'cover' and 'payload' are required")
+        payload_name = parts['payload'][0] or ''
+        file_ext = query.get('ext', os.path.splitext(payload_name)[1])
+        options = {}
+        for name, convert in HIDE_OPTIONS.items():
+            if name in query:
+                try:
+                    options[name] = convert(query[name])
+                except ValueError:
+                    raise HTTPError(400, f"Invalid value for {name}: {query[name]!r}")
+        stego = await self.run_in_pool(_hide, parts['cover'][1], parts['payload'][1], file_ext, options)
+        image_format = options.get('format', '.png').lstrip('.').lower()
+        content_type = 'image/tiff' if image_format in ('tif', 'tiff') else f"image/{image_format}"
+        return 200, {'Content-Type': content_type}, stego
+
+    async def handle_extract(self, query: dict, headers: dict, body: bytes):
+        data, file_ext = await self.run_in_pool(_extract, body)
+        return 200, {'Content-Type': 'application/octet-stream', 'X-File-Extension': file_ext,
+                     'Content-Disposition': f'attachment; filename="extracted{file_ext}"'}, data
+
+    async def handle_analyze(self, query: dict, headers: dict, body: bytes):
+        parts = parse_multipart(body, headers.get('content-type', ''))
+        if 'original' not in parts or 'stego' not in parts:
+            raise HTTPError(400, "Fields 'original' and 'stego' are required")
+        metrics = await self.run_in_pool(_analyze, parts['original'][1], parts['stego'][1])
+        return self.json_response(metrics)
+
+    async def handle_capacity(self, query: dict, headers: dict, body: bytes):
+        from steganography_tool import SteganographyTool, header_dimensions
+        dimensions = header_dimensions(body[:32])
+        if dimensions is None:
+            dimensions = await self.run_in_pool(_dimensions, body)
+        height, width = dimensions
+        tool = SteganographyTool()
+        file_ext = query.get('ext', '')
+        try:
+            header_bytes = len(tool.build_header(0, 0, file_ext))
+        except Exception as e:
+            raise HTTPError(400, str(e))
+        return self.json_response({'width': width, 'height': height, 'header_bytes': header_bytes,
+                                   'capacity': tool.capacity(height, width, file_ext)})
+
+    async def handle_metrics(self, query: dict, headers: dict, body: bytes):
+        lines = ["# TYPE steganography_request_seconds histogram"]
+        for endpoint, histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(self.format_buckets(histogram.buckets), histogram.counts):
+                cumulative += count
+                lines.append(f'steganography_request_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'steganography_request_seconds_sum{{endpoint="{endpoint}"}} {histogram.sum:.6f}')
+            lines.append(f'steganography_request_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+        lines.append("# TYPE steganography_responses_total counter")
+        for (endpoint, status), count in sorted(self.responses.items()):
+            lines.append(f'steganography_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines += [
+            "# TYPE steganography_in_flight gauge",
+            f"steganography_in_flight {self.in_flight}",
+            "# TYPE steganography_queue_depth gauge",
+            f"steganography_queue_depth {max(0, self.in_flight - self.workers)}",
+            "# TYPE steganography_queue_limit gauge",
+            f"steganography_queue_limit {self.max_queue}",
+            "# TYPE steganography_workers gauge",
+            f"steganography_workers {self.workers}",
+            "# TYPE steganography_rejected_total counter",
+            f"steganography_rejected_total {self.rejected}"
+        ]
+        return 200, {'Content-Type': 'text/plain; version=0.0.4'}, ("\n".join(lines) + "\n").encode('utf-8')
+
+    @staticmethod
+    def format_buckets(buckets):
+        return [f"{bound:g}" for bound in buckets] + ["+Inf"]
+
+    @staticmethod
+    def json_response(data: dict):
+        return 200, {'Content-Type': 'application/json'}, json.dumps(data).encode('utf-8')
+
+    async def dispatch(self, method: str, target: str, headers: dict, body: bytes):
+        url = urlsplit(target)
+        route = self.routes.get(url.path)
+        if route is None:
+            raise HTTPError(404, f"No endpoint {url.path}")
+        if method != route[0]:
+            raise HTTPError(405, f"Use {route[0]} for {url.path}")
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return await route[1](query, headers, body)
+
+    async def read_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode('latin-1').rstrip("\r\n").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADER_LINES:
+                raise HTTPError(431, "Too many header lines")
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if 'transfer-encoding' in headers:
+            raise HTTPError(411, "Send a Content-Length, chunked bodies are not supported")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body:
+            raise HTTPError(413, f"Request body exceeds {self.max_body:,} bytes")
+        if length and headers.get('expect', '').lower() == '100-continue':
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            await writer.drain()
+        body = await reader.readexactly(length) if length else b""
+        return method, target, version, headers, body
+
+    def write_response(self, writer: asyncio.StreamWriter, status: int, headers: dict, content, keep_alive: bool):
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Length: {len(content)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        writer.write(content)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            keep_alive = True
+            while keep_alive:
+                started = time.perf_counter()
+                endpoint = 'invalid'
+                try:
+                    request = await self.read_request(reader, writer)
+                    if request is None:
+                        break
+                    method, target, version, headers, body = request
+                    endpoint = urlsplit(target).path.strip('/') if urlsplit(target).path in self.routes else 'unknown'
+                    keep_alive = version == "HTTP/1.1" and headers.get('connection', '').lower() != 'close'
+                    status, response_headers, content = await self.dispatch(method, target, headers, body)
+                except HTTPError as e:
+                    # the body of a rejected request may be unread, so the connection cannot be reused
+                    keep_alive = keep_alive and e.status not in (411, 413, 431) and endpoint != 'invalid'
+                    status, response_headers, content = e.status, {'Content-Type': 'application/json'}, \
+                        json.dumps({'error': str(e)}).encode('utf-8')
+                    if e.status == 503:
+                        response_headers['Retry-After'] = "1"
+                except ValueError:
+                    keep_alive = False
+                    status, response_headers, content = 431, {'Content-Type': 'application/json'}, \
+                        json.dumps({'error': "Header line too long"}).encode('utf-8')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    raise
+                except Exception as e:
+                    keep_alive = False
+                    status, response_headers, content = 500, {'Content-Type': 'application/json'}, \
+                        json.dumps({'error': str(e)}).encode('utf-8')
+                self.write_response(writer, status, response_headers, content, keep_alive)
+                await writer.drain()
+                self.latency.setdefault(endpoint, LatencyHistogram()).observe(time.perf_counter() - started)
+                self.responses[(endpoint, status)] = self.responses.get((endpoint, status), 0) + 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, port: int = DEFAULT_PORT, ready=None):
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+            self.executor = executor
+            server = await asyncio.start_server(self.handle_connection, HOST, port)
+            if ready is not None:
+                ready(server.sockets[0].getsockname()[1])
+            async with server:
+                await server.serve_forever()
+
+def run_service(port: int = DEFAULT_PORT, workers: int = None, max_body: int = DEFAULT_MAX_BODY,
+                max_queue: int = None, log=None):
+    service = SteganographyService(workers, max_body, max_queue)
+    ready = None
+    if log is not None:
+        ready = lambda bound_port: log(f"Listening on http://{HOST}:{bound_port} with {service.workers} workers")
+    try:
+        asyncio.run(service.serve(port, ready))
+    except KeyboardInterrupt:
+        pass
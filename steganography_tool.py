@@ -1,60 +1,1130 @@
+import bz2
+import contextlib
+import io
+import lzma
 import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 import base64
+from steganography_frames import TIFF_EXTENSIONS, FrameSequence, FrameWriter
+
+HEADER_MAGIC = b"STEG"
+HEADER_VERSION = 6
+HEADER_PREFIX = struct.Struct(">4sB")
+HEADER_LAYOUTS = {
+    1: (struct.Struct(">Q"), ("length",)),
+    2: (struct.Struct(">QIB"), ("length", "crc32", "ext_length")),
+    3: (struct.Struct(">BQIB"), ("bits_per_channel", "length", "crc32", "ext_length")),
+    4: (struct.Struct(">BQIBQHH"), ("bits_per_channel", "length", "crc32", "ext_length",
+                                     "set_id", "shard_index", "shard_count")),
+    5: (struct.Struct(">BQIBQHHBQ"), ("bits_per_channel", "length", "crc32", "ext_length",
+                                       "set_id", "shard_index", "shard_count", "codec", "original_length")),
+    6: (struct.Struct(">BQIBQHHBQII"), ("bits_per_channel", "length", "crc32", "ext_length", "set_id", "shard_index",
+                                         "shard_count", "codec", "original_length", "chunk_size", "chunk_count")),
+}
+INDEX_ENTRY = struct.Struct(">II")
+CODECS = ('none', 'zlib', 'bz2', 'lzma')
+AUTO_SAMPLE_BYTES = 64 << 10
+AUTO_MIN_RATIO = 0.9
+SPOOL_BYTES = 64 << 20
+MAX_BITS_PER_CHANNEL = 4
+CHUNK_BYTES = 1 << 20
+PAYLOAD_CHUNK_BYTES = 1 << 20
+MAX_REPORTED_CHUNKS = 10
+DEFAULT_BAND_BYTES = 16 << 20
+STREAMABLE_EXTENSIONS = ('.bmp', '.npy', '.tif', '.tiff')
+LOSSLESS_EXTENSIONS = ('.png', '.bmp', '.tif', '.tiff', '.ppm', '.pgm', '.pbm', '.pnm')
+DEFAULT_CACHE_BYTES = 512 << 20
+ENCODE_FORMATS = ('.png', '.webp', '.tif', '.tiff')
+DEFAULT_PNG_LEVEL = 3
+WEBP_LOSSLESS_QUALITY = 101
+TIFF_COMPRESSION_NONE = 1
+TIFF_COMPRESSION_LZW = 5
+LEGACY_PROBE_BYTES = 32
+PROBE_SAMPLES = (HEADER_PREFIX.size + max(layout.size for layout, _ in HEADER_LAYOUTS.values()) + 255) * 8
+PROBE_EXTENSIONS = ('.png', '.bmp', '.tif', '.tiff', '.npy', '.webp')
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+METRICS_BAND_SAMPLES = 1 << 22
+SSIM_RADIUS = 5
+SSIM_PREVIEW_SIDE = 1024
+SSIM_SIGMA = 1.5
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+CHANNEL_NAMES = {1: ('gray',), 2: ('gray', 'alpha'), 3: ('blue', 'green', 'red'),
+                 4: ('blue', 'green', 'red', 'alpha')}
+SQUARES = np.arange(256, dtype=np.int64) ** 2
+LEGACY_PREFIX = re.compile(rb"(\.[^|]{0,24})?\|\|\|")
+
+def pack_bit_groups(bits: np.ndarray, bits_per_channel: int) -> np.ndarray:
+    if bits_per_channel == 1:
+        return bits
+    groups = np.packbits(bits.reshape(-1, bits_per_channel), axis=1)[:, 0]
+    return groups >> (8 - bits_per_channel)
+
+def unpack_bit_groups(values: np.ndarray, bits_per_channel: int) -> np.ndarray:
+    if bits_per_channel == 1:
+        return values
+    return np.unpackbits(values[:, None], axis=1)[:, 8 - bits_per_channel:].reshape(-1)
+
+def required_samples(header_size: int, length: int, bits_per_channel: int = 1) -> int:
+    return header_size * 8 + -(-length * 8 // bits_per_channel)
+
+def sample_range(image: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Flattened samples [start, stop) of an image, copying only the rows that hold them."""
+    if image.ndim == 1:
+        return image[start:stop]
+    row_size = image[0].size
+    first_row, last_row = start // row_size, -(-stop // row_size)
+    rows = image[first_row:last_row].reshape(-1)
+    return rows[start - first_row * row_size:stop - first_row * row_size]
+
+def read_lsb_bytes(image: np.ndarray, base: int, bit_offset: int, num_bytes: int,
+                   bits_per_channel: int = 1) -> np.ndarray:
+    """Read num_bytes hidden bytes starting bit_offset bits into the data that begins at sample base."""
+    first = bit_offset // bits_per_channel
+    stop = -(-(bit_offset + num_bytes * 8) // bits_per_channel)
+    values = sample_range(image, base + first, base + stop) & ((1 << bits_per_channel) - 1)
+    skip = bit_offset - first * bits_per_channel
+    return np.packbits(unpack_bit_groups(values, bits_per_channel)[skip:skip + num_bytes * 8])
+
+def ordered_map(function, items, workers: int = None):
+    """Executor.map that keeps at most two tasks per worker in flight, so large inputs are streamed."""
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def split_chunks(data, chunk_size: int = PAYLOAD_CHUNK_BYTES):
+    view = memoryview(data)
+    for offset in range(0, len(view), chunk_size):
+        yield view[offset:offset + chunk_size]
+
+def iter_image_files(paths, extensions):
+    """Yield the given files, plus every file below the given directories with one of the extensions."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for folder, folders, names in os.walk(path):
+            folders.sort()
+            for name in sorted(names):
+                if os.path.splitext(name)[1].lower() in extensions:
+                    yield os.path.join(folder, name)
+
+def header_dimensions(head: bytes):
+    """(height, width) from the first bytes of a PNG or BMP file, or None for other formats."""
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+        width, height = struct.unpack_from(">II", head, 16)
+        return height, width
+    if head[:2] == b"BM" and len(head) >= 26:
+        width, height = struct.unpack_from("<ii", head, 18)
+        return abs(height), width
+    return None
+
+def _png_unfilter(filter_type: int, line: bytes, previous: bytearray, bpp: int) -> bytearray:
+    current = bytearray(len(line))
+    for i, value in enumerate(line):
+        left = current[i - bpp] if i >= bpp else 0
+        up = previous[i]
+        if filter_type == 1:
+            value += left
+        elif filter_type == 2:
+            value += up
+        elif filter_type == 3:
+            value += (left + up) >> 1
+        elif filter_type == 4:
+            up_left = previous[i - bpp] if i >= bpp else 0
+            estimate = left + up - up_left
+            distances = (abs(estimate - left), abs(estimate - up), abs(estimate - up_left))
+            value += (left, up, up_left)[distances.index(min(distances))]
+        elif filter_type != 0:
+            raise Exception(f"Invalid PNG filter type {filter_type}")
+        current[i] = value & 0xFF
+    return current
+
+def read_png_prefix(file, num_samples: int):
+    """Decode only the leading pixels of an 8-bit non-interlaced PNG.
+
+    Returns (samples, (height, width)) with samples in the BGR order cv2.imread produces, or None when the
+    file needs a full decode (other bit depths, palettes, interlacing).
+    """
+    if file.read(8) != PNG_SIGNATURE:
+        return None
+    decompressor = zlib.decompressobj()
+    raw = bytearray()
+    layout = None
+    while True:
+        chunk_head = file.read(8)
+        if len(chunk_head) < 8:
+            return None
+        length, kind = struct.unpack(">I4s", chunk_head)
+        data = file.read(length)
+        file.seek(4, os.SEEK_CUR)
+        if kind == b"IHDR":
+            width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", data[:13])
+            if depth != 8 or interlace or color_type not in PNG_CHANNELS:
+                return None
+            channels = PNG_CHANNELS[color_type]
+            pixels = min(width * height, -(-num_samples // 3))
+            prefix_lengths = [min(width, pixels - row * width) * channels for row in range(-(-pixels // width))]
+            needed = (len(prefix_lengths) - 1) * (width * channels + 1) + 1 + prefix_lengths[-1]
+            layout = (width, height, channels, prefix_lengths)
+        elif kind == b"IDAT" and layout is not None:
+            raw += decompressor.decompress(data, needed - len(raw))
+            if len(raw) >= needed:
+                break
+        elif kind == b"IEND":
+            return None
+    width, height, channels, prefix_lengths = layout
+    stride = width * channels + 1
+    previous = bytearray(width * channels)
+    rows = []
+    for row, prefix_length in enumerate(prefix_lengths):
+        start = row * stride
+        previous = _png_unfilter(raw[start], raw[start + 1:start + 1 + prefix_length], previous, channels)
+        rows.append(previous)
+    pixels = np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(-1, channels)
+    if channels >= 3:
+        pixels = pixels[:, 2::-1]
+    else:
+        pixels = np.repeat(pixels[:, :1], 3, axis=1)
+    return np.ascontiguousarray(pixels).reshape(-1)[:num_samples], (height, width)
+
+def psnr_from_mse(mse: float):
+    return 20 * np.log10(255.0 / np.sqrt(mse)) if mse else float('inf')
+
+def band_histogram(rows, channel: int):
+    return cv2.calcHist([rows], [channel], None, [256], [0, 256]).ravel().astype(np.int64)
+
+def ssim_map(original, stego):
+    """Gaussian-window SSIM map of two uint8 bands, all channels at once."""
+    x = original.astype(np.float32)
+    y = stego.astype(np.float32)
+    size = (2 * SSIM_RADIUS + 1, 2 * SSIM_RADIUS + 1)
+    blur = lambda values: cv2.GaussianBlur(values, size, SSIM_SIGMA)
+    mu_x = blur(x)
+    mu_y = blur(y)
+    sigma_xx = blur(x * x)
+    sigma_yy = blur(y * y)
+    sigma_xy = blur(x * y)
+    mu_xx = mu_x * mu_x
+    mu_yy = mu_y * mu_y
+    mu_xy = mu_x * mu_y
+    sigma_xx -= mu_xx
+    sigma_yy -= mu_yy
+    sigma_xy -= mu_xy
+    numerator = (2 * mu_xy + SSIM_C1) * (2 * sigma_xy + SSIM_C2)
+    numerator /= (mu_xx + mu_yy + SSIM_C1) * (sigma_xx + sigma_yy + SSIM_C2)
+    return numerator
+
+def make_compressor(codec: str, level: int = None):
+    if codec == 'zlib':
+        return zlib.compressobj(6 if level is None else level)
+    if codec == 'bz2':
+        return bz2.BZ2Compressor(9 if level is None else level)
+    if codec == 'lzma':
+        return lzma.LZMACompressor(preset=level)
+    raise Exception(f"Unknown compression codec {codec!r}, expected one of {', '.join(CODECS)}")
+
+def make_decompressor(codec: str):
+    if codec == 'none':
+        return None
+    if codec == 'zlib':
+        return zlib.decompressobj()
+    if codec == 'bz2':
+        return bz2.BZ2Decompressor()
+    if codec == 'lzma':
+        return lzma.LZMADecompressor()
+    raise Exception(f"Unknown compression codec {codec!r}")
+
+class LSBWriter:
+    def __init__(self, blocks):
+        self._blocks = iter(blocks)
+        self._block = None
+        self._pos = 0
+        self._bits_per_channel = 1
+        self._pending = np.empty(0, dtype=np.uint8)
+
+    def set_bits_per_channel(self, bits_per_channel: int):
+        self.flush()
+        self._bits_per_channel = bits_per_channel
+
+    def _write_values(self, values: np.ndarray):
+        mask = (0xFF << self._bits_per_channel) & 0xFF
+        offset = 0
+        while offset < values.size:
+            if self._block is None or self._pos >= self._block.size:
+                self._block = next(self._blocks, None)
+                self._pos = 0
+                if self._block is None:
+                    raise Exception("Not enough image capacity for the payload")
+                continue
+            target = self._block[self._pos:self._pos + values.size - offset]
+            np.bitwise_and(target, mask, out=target)
+            np.bitwise_or(target, values[offset:offset + target.size], out=target)
+            self._pos += target.size
+            offset += target.size
+
+    def write_bits(self, bits: np.ndarray):
+        bits_per_channel = self._bits_per_channel
+        if self._pending.size:
+            bits = np.concatenate([self._pending, bits])
+        usable = bits.size - bits.size % bits_per_channel
+        self._pending = bits[usable:].copy()
+        self._write_values(pack_bit_groups(bits[:usable], bits_per_channel))
+
+    def write_bytes(self, data):
+        view = memoryview(data)
+        for offset in range(0, len(view), CHUNK_BYTES):
+            self.write_bits(np.unpackbits(np.frombuffer(view[offset:offset + CHUNK_BYTES], dtype=np.uint8)))
+
+    def flush(self):
+        if self._pending.size:
+            padded = np.zeros(self._bits_per_channel, dtype=np.uint8)
+            padded[:self._pending.size] = self._pending
+            self._pending = np.empty(0, dtype=np.uint8)
+            self._write_values(pack_bit_groups(padded, self._bits_per_channel))
+
+    def close(self):
+        self.flush()
+        close = getattr(self._blocks, 'close', None)
+        if close is not None:
+            close()
+
+class LSBReader:
+    def __init__(self, blocks, piece_bytes: int = CHUNK_BYTES):
+        self._blocks = iter(blocks)
+        self._piece_bytes = piece_bytes
+        self._block = np.empty(0, dtype=np.uint8)
+        self._pos = 0
+        self._bits_per_channel = 1
+        self._pending = np.empty(0, dtype=np.uint8)
+
+    def set_bits_per_channel(self, bits_per_channel: int):
+        self._pending = np.empty(0, dtype=np.uint8)
+        self._bits_per_channel = bits_per_channel
+
+    def _read_values(self, count: int) -> np.ndarray:
+        mask = (1 << self._bits_per_channel) - 1
+        parts = []
+        while count > 0:
+            if self._pos >= self._block.size:
+                block = next(self._blocks, None)
+                if block is None:
+                    raise Exception("Unexpected end of image data")
+                self._block, self._pos = block, 0
+                continue
+            values = self._block[self._pos:self._pos + count] & mask
+            self._pos += values.size
+            count -= values.size
+            parts.append(values)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint8)
+
+    def read_bits(self, count: int) -> np.ndarray:
+        bits_per_channel = self._bits_per_channel
+        if bits_per_channel == 1 and not self._pending.size:
+            return self._read_values(count)
+        missing = max(0, count - self._pending.size)
+        bits = unpack_bit_groups(self._read_values(-(-missing // bits_per_channel)), bits_per_channel)
+        if self._pending.size:
+            bits = np.concatenate([self._pending, bits])
+        self._pending = bits[count:].copy()
+        return bits[:count]
+
+    def iter_bytes(self, num_bytes: int):
+        for offset in range(0, num_bytes, self._piece_bytes):
+            end = min(offset + self._piece_bytes, num_bytes)
+            yield np.packbits(self.read_bits((end - offset) * 8))
+
+    def read_bytes(self, num_bytes: int) -> np.ndarray:
+        data = np.empty(num_bytes, dtype=np.uint8)
+        offset = 0
+        for chunk in self.iter_bytes(num_bytes):
+            data[offset:offset + chunk.size] = chunk
+            offset += chunk.size
+        return data
+
+class ImageCache:
+    """LRU cache of decoded images keyed by path, mtime and size, bounded by a byte budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, image_path: str, flags: int):
+        stat = os.stat(image_path)
+        return os.path.abspath(image_path), flags, stat.st_mtime_ns, stat.st_size
+
+    def load(self, image_path: str, flags: int = cv2.IMREAD_COLOR):
+        key = self._key(image_path, flags)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image.view()
+            self.misses += 1
+        image = cv2.imread(image_path, flags)
+        if image is None:
+            return None
+        return self._insert(key, image)
+
+    def store(self, image_path: str, image: np.ndarray, flags: int = cv2.IMREAD_COLOR):
+        """Cache an image that was just written to image_path, taking ownership of the array."""
+        return self._insert(self._key(image_path, flags), image)
+
+    def _insert(self, key, image: np.ndarray):
+        image.setflags(write=False)
+        with self._lock:
+            self._remove(lambda cached: cached[:2] == key[:2])
+            if image.nbytes <= self.max_bytes:
+                self._entries[key] = image
+                self.bytes += image.nbytes
+                while self.bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.bytes -= evicted.nbytes
+                    self.evictions += 1
+        return image.view()
+
+    def _remove(self, matches):
+        for key in [key for key in self._entries if matches(key)]:
+            self.bytes -= self._entries.pop(key).nbytes
+
+    def invalidate(self, image_path: str):
+        path = os.path.abspath(image_path)
+        with self._lock:
+            self._remove(lambda key: key[0] == path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes
+            }
 
 class SteganographyTool:
-    def __init__(self):
+    def __init__(self, track_memory: bool = False, image_cache: ImageCache = None,
+                 cancel_event: threading.Event = None):
         self.delimiter = "<<<END_OF_FILE>>>"
+        self.track_memory = track_memory
+        self.image_cache = image_cache
+        self.cancel_event = cancel_event
+        self.observers = []
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
 
-    def file_to_binary(self, file_path: str) -> str:
+    def _emit(self, event: dict):
+        for observer in list(self.observers):
+            observer(event)
+
+    def _check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise Exception("Cancelled")
+
+    @contextlib.contextmanager
+    def _stage(self, stage: str, num_bytes: int = None):
+        self._check_cancelled()
+        info = {'bytes': num_bytes}
+        if not self.observers:
+            yield info
+            return
+        started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._emit({'event': 'stage_start', 'stage': stage})
+        started = time.perf_counter()
         try:
+            yield info
+        finally:
+            duration = time.perf_counter() - started
+            peak_memory = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+            if started_tracing:
+                tracemalloc.stop()
+            self._emit({'event': 'stage_end', 'stage': stage, 'duration': duration, 'bytes': info['bytes'],
+                        'peak_memory': peak_memory})
+
+    def _progress(self, stage: str, done: int, total: int):
+        self._check_cancelled()
+        if self.observers:
+            self._emit({'event': 'progress', 'stage': stage, 'bytes': done,
+                        'fraction': done / total if total else 1.0})
+
+    def _track_progress(self, chunks, stage: str, total: int):
+        done = 0
+        for chunk in chunks:
+            yield chunk
+            done += len(chunk)
+            self._progress(stage, done, total)
+
+    def build_header(self, length: int, crc32: int, file_ext: str, bits_per_channel: int = 1,
+                     set_id: int = 0, shard_index: int = 0, shard_count: int = 1,
+                     codec: str = 'none', original_length: int = None, chunk_size: int = 0,
+                     index: bytes = b"") -> bytes:
+        """Pack a stego header. With chunk_size 0 the payload is one stream checked by crc32; otherwise it is
+        split into chunk_size pieces of original data, each compressed on its own, and crc32 covers the index
+        of (stored length, crc32) entries that follows the file extension."""
+        if not 1 <= bits_per_channel <= MAX_BITS_PER_CHANNEL:
+            raise Exception(f"Bits per channel must be between 1 and {MAX_BITS_PER_CHANNEL}")
+        file_ext = file_ext.encode('utf-8')
+        if len(file_ext) > 255:
+            raise Exception("File extension too long")
+        layout = HEADER_LAYOUTS[HEADER_VERSION][0]
+        return (HEADER_PREFIX.pack(HEADER_MAGIC, HEADER_VERSION)
+                + layout.pack(bits_per_channel, length, crc32, len(file_ext), set_id, shard_index, shard_count,
+                              CODECS.index(codec), length if original_length is None else original_length,
+                              chunk_size, len(index) // INDEX_ENTRY.size)
+                + file_ext + index)
+
+    def build_chunked_header(self, length: int, index: bytes, file_ext: str, bits_per_channel: int = 1,
+                             codec: str = 'none', original_length: int = None) -> bytes:
+        return self.build_header(length, zlib.crc32(index), file_ext, bits_per_channel, codec=codec,
+                                 original_length=original_length, chunk_size=PAYLOAD_CHUNK_BYTES, index=index)
+
+    def select_codec(self, file_path: str, compression_level: int = None) -> str:
+        with open(file_path, 'rb') as file:
+            sample = file.read(AUTO_SAMPLE_BYTES)
+        return self.select_codec_for_data(sample, compression_level)
+
+    def select_codec_for_data(self, data, compression_level: int = None) -> str:
+        sample = memoryview(data)[:AUTO_SAMPLE_BYTES]
+        best_codec, best_size = 'none', len(sample) * AUTO_MIN_RATIO
+        for codec in CODECS[1:]:
+            compressor = make_compressor(codec, compression_level)
+            size = len(compressor.compress(sample)) + len(compressor.flush())
+            if size < best_size:
+                best_codec, best_size = codec, size
+        return best_codec
+
+    def resolve_codec(self, file_path: str, compression: str, compression_level: int = None, data=None) -> str:
+        if compression == 'auto':
+            if data is not None:
+                return self.select_codec_for_data(data, compression_level)
+            return self.select_codec(file_path, compression_level)
+        if compression not in CODECS:
+            raise Exception(f"Unknown compression {compression!r}, expected 'auto' or one of {', '.join(CODECS)}")
+        return compression
+
+    def compress_file(self, file_path: str, codec: str, compression_level: int, output) -> int:
+        compressor = make_compressor(codec, compression_level)
+        original_length = 0
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(CHUNK_BYTES), b""):
+                original_length += len(chunk)
+                output.write(compressor.compress(chunk))
+        output.write(compressor.flush())
+        return original_length
+
+    def load_payload(self, file_path: str, compression: str = 'none', compression_level: int = None):
+        codec = self.resolve_codec(file_path, compression, compression_level)
+        if codec == 'none':
             with open(file_path, 'rb') as file:
                 file_data = file.read()
-            file_ext = os.path.splitext(file_path)[1]
-            file_info = f"{file_ext}|||{base64.b64encode(file_data).decode('utf-8')}"
-            binary_data = ''.join(format(ord(char), '08b') for char in file_info)
-            delimiter_binary = ''.join(format(ord(char), '08b') for char in self.delimiter)
-            return binary_data + delimiter_binary
+            return codec, file_data, len(file_data)
+        buffer = io.BytesIO()
+        original_length = self.compress_file(file_path, codec, compression_level, buffer)
+        return codec, buffer.getbuffer(), original_length
+
+    def pack_chunks(self, chunks, codec: str, compression_level: int = None, output=None, workers: int = None):
+        """Compress chunks independently across threads, returning (original_length, index).
+
+        Stored chunks are written to output in order when it is given.
+        """
+        def pack(chunk):
+            stored = chunk
+            if codec != 'none':
+                compressor = make_compressor(codec, compression_level)
+                stored = compressor.compress(chunk) + compressor.flush()
+            return len(chunk), stored, zlib.crc32(stored)
+
+        original_length, index = 0, bytearray()
+        for length, stored, crc32 in ordered_map(pack, chunks, workers):
+            original_length += length
+            index += INDEX_ENTRY.pack(len(stored), crc32)
+            if output is not None:
+                output.write(stored)
+        return original_length, bytes(index)
+
+    def file_to_payload(self, file_path: str, bits_per_channel: int = 1, compression: str = 'none',
+                        compression_level: int = None):
+        try:
+            codec = self.resolve_codec(file_path, compression, compression_level)
+            with open(file_path, 'rb') as file:
+                if codec == 'none':
+                    file_data = file.read()
+                    original_length, index = self.pack_chunks(split_chunks(file_data), codec)
+                else:
+                    buffer = io.BytesIO()
+                    original_length, index = self.pack_chunks(iter(lambda: file.read(PAYLOAD_CHUNK_BYTES), b""),
+                                                              codec, compression_level, buffer)
+                    file_data = buffer.getbuffer()
+            header = self.build_chunked_header(len(file_data), index, os.path.splitext(file_path)[1],
+                                               bits_per_channel, codec, original_length)
+            return header, file_data
         except Exception as e:
             raise Exception(f"Error reading file: {str(e)}")
 
-    def binary_to_file(self, binary_data: str, output_path: str):
-        try:
-            text_data = ""
-            for i in range(0, len(binary_data), 8):
-                byte = binary_data[i:i+8]
-                if len(byte) == 8:
-                    text_data += chr(int(byte, 2))
-            if self.delimiter in text_data:
-                text_data = text_data.split(self.delimiter)[0]
-            if "|||" in text_data:
-                file_ext, encoded_data = text_data.split("|||", 1)
-                file_data = base64.b64decode(encoded_data.encode('utf-8'))
-                if not output_path.endswith(file_ext):
-                    output_path += file_ext
-                with open(output_path, 'wb') as file:
-                    file.write(file_data)
-                return output_path
-            else:
-                raise Exception("Invalid data format")
+    def spool_payload(self, file_path: str, bits_per_channel: int = 1, compression: str = 'none',
+                      compression_level: int = None):
+        """Like file_to_payload, but returns (header, source, length) with the stored chunks in a file object
+        (the secret itself, or a spooled temporary file when compressed) instead of memory."""
+        try:
+            codec = self.resolve_codec(file_path, compression, compression_level)
+            with open(file_path, 'rb') as file:
+                chunks = iter(lambda: file.read(PAYLOAD_CHUNK_BYTES), b"")
+                if codec == 'none':
+                    source = open(file_path, 'rb')
+                    original_length, index = self.pack_chunks(chunks, codec)
+                    length = original_length
+                else:
+                    source = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+                    original_length, index = self.pack_chunks(chunks, codec, compression_level, source)
+                    length = source.tell()
+            header = self.build_chunked_header(length, index, os.path.splitext(file_path)[1], bits_per_channel,
+                                               codec, original_length)
+            return header, source, length
+        except Exception as e:
+            raise Exception(f"Error reading file: {str(e)}")
+
+    def _write_spooled(self, writer: LSBWriter, source, length: int, bits_per_channel: int):
+        writer.set_bits_per_channel(bits_per_channel)
+        source.seek(0)
+        chunks = iter(lambda: source.read(CHUNK_BYTES), b"")
+        for chunk in self._track_progress(chunks, 'embed', length):
+            writer.write_bytes(chunk)
+        writer.close()
+
+    def bytes_to_payload(self, data, file_ext: str = '', bits_per_channel: int = 1, compression: str = 'none',
+                         compression_level: int = None):
+        try:
+            data = memoryview(data).cast('B')
+            codec = self.resolve_codec(None, compression, compression_level, data=data)
+            file_data = data
+            output = None if codec == 'none' else io.BytesIO()
+            _, index = self.pack_chunks(split_chunks(data), codec, compression_level, output)
+            if output is not None:
+                file_data = output.getbuffer()
+            header = self.build_chunked_header(len(file_data), index, file_ext, bits_per_channel, codec, len(data))
+            return header, file_data
+        except Exception as e:
+            raise Exception(f"Error reading payload: {str(e)}")
+
+    def _decode_chunks(self, chunks, codec: str, original_length: int, crc32: int = None):
+        decompressor = make_decompressor(codec)
+        stored_crc32, written = 0, 0
+        for chunk in chunks:
+            if crc32 is not None:
+                stored_crc32 = zlib.crc32(chunk, stored_crc32)
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+            yield chunk
+            written += len(chunk)
+        if crc32 is not None and stored_crc32 != crc32:
+            raise Exception("Checksum mismatch, hidden data is corrupted")
+        if decompressor is not None and not decompressor.eof:
+            raise Exception("Compressed payload is truncated")
+        if written != original_length:
+            raise Exception(f"Expected {original_length} bytes but recovered {written}")
+
+    def _write_chunks(self, output_path: str, chunks):
+        try:
+            with open(output_path, 'wb') as file:
+                for chunk in chunks:
+                    file.write(chunk)
+        except Exception:
+            os.remove(output_path)
+            raise
+
+    def _write_payload(self, output_path: str, chunks, codec: str, original_length: int, crc32: int = None):
+        self._write_chunks(output_path, self._decode_chunks(chunks, codec, original_length, crc32))
+
+    def _chunk_span(self, header: dict, index: int):
+        start = index * header['chunk_size']
+        return start, min(start + header['chunk_size'], header['original_length'])
+
+    def _read_chunk(self, image: np.ndarray, header: dict, index: int):
+        start, stop = header['chunk_offsets'][index:index + 2]
+        stored = read_lsb_bytes(image, header['size'] * 8, int(start) * 8, int(stop - start),
+                                header['bits_per_channel'])
+        return self._decode_chunk(header, index, stored)
+
+    def _iter_stored_chunks(self, reader: LSBReader, header: dict):
+        reader.set_bits_per_channel(header['bits_per_channel'])
+        for index, length in enumerate(np.diff(header['chunk_offsets'])):
+            yield index, reader.read_bytes(int(length))
+
+    def _decode_chunk(self, header: dict, index: int, stored: np.ndarray):
+        """Verify and decompress one stored chunk, returning (index, data, error)."""
+        try:
+            if zlib.crc32(stored) != header['chunk_crcs'][index]:
+                raise Exception("checksum mismatch")
+            data = stored
+            decompressor = make_decompressor(header['codec'])
+            if decompressor is not None:
+                data = decompressor.decompress(stored)
+                if not decompressor.eof:
+                    raise Exception("compressed chunk is truncated")
+            span_start, span_end = self._chunk_span(header, index)
+            if len(data) != span_end - span_start:
+                raise Exception(f"expected {span_end - span_start} bytes but decoded {len(data)}")
+            return index, data, None
+        except Exception as e:
+            return index, None, str(e)
+
+    def _scan_chunks(self, image: np.ndarray, header: dict, indices=None, workers: int = None,
+                     reader: LSBReader = None):
+        """Verify and decode chunks across threads, yielding (index, data, error) in order.
+
+        Chunks are read at their offsets in image, or one after another from reader when the samples can
+        only be read in order (frame sequences); indices must then cover every chunk.
+        """
+        if indices is None:
+            indices = range(header['chunk_count'])
+        total = sum(end - start for start, end in (self._chunk_span(header, index) for index in indices))
+        done = 0
+        if reader is None:
+            items, decode = indices, lambda index: self._read_chunk(image, header, index)
+        else:
+            items, decode = self._iter_stored_chunks(reader, header), lambda item: self._decode_chunk(header, *item)
+        for index, data, error in ordered_map(decode, items, workers):
+            yield index, data, error
+            start, end = self._chunk_span(header, index)
+            done += end - start
+            self._progress('extract', done, total)
+
+    def _iter_container(self, image: np.ndarray, header: dict, indices=None, workers: int = None,
+                        reader: LSBReader = None):
+        """Yield decoded chunks in order; once one is corrupt the rest are only checked, then all are reported."""
+        corrupt = []
+        for index, data, error in self._scan_chunks(image, header, indices, workers, reader):
+            if error is not None:
+                corrupt.append(self._chunk_report(header, index, error))
+            elif not corrupt:
+                yield data
+        if corrupt:
+            described = ", ".join(f"chunk {report['index'] + 1} (bytes {report['start']}-{report['end'] - 1}: "
+                                  f"{report['error']})" for report in corrupt[:MAX_REPORTED_CHUNKS])
+            if len(corrupt) > MAX_REPORTED_CHUNKS:
+                described += f" and {len(corrupt) - MAX_REPORTED_CHUNKS} more"
+            raise Exception(f"{len(corrupt)} of {header['chunk_count']} chunks are corrupted: {described}")
+
+    def _chunk_report(self, header: dict, index: int, error: str):
+        start, end = self._chunk_span(header, index)
+        return {'index': index, 'start': start, 'end': end, 'error': error}
+
+    def payload_to_file(self, header: dict, chunks, output_path: str):
+        """Write the decoded chunks returned by _locate_payload to output_path plus the hidden extension."""
+        try:
+            file_ext = header['ext']
+            if not output_path.endswith(file_ext):
+                output_path += file_ext
+            self._write_chunks(output_path, chunks)
+            return output_path
+        except Exception as e:
+            raise Exception(f"Error reconstructing file: {str(e)}")
+
+    def parse_legacy_payload(self, file_info: bytes):
+        if b"|||" not in file_info:
+            raise Exception("Invalid data format")
+        file_ext, encoded_data = file_info.decode('utf-8').split("|||", 1)
+        return file_ext, base64.b64decode(encoded_data.encode('utf-8'))
+
+    def legacy_payload_to_file(self, file_info: bytes, output_path: str):
+        try:
+            file_ext, file_data = self.parse_legacy_payload(file_info)
+            if not output_path.endswith(file_ext):
+                output_path += file_ext
+            with open(output_path, 'wb') as file:
+                file.write(file_data)
+            return output_path
         except Exception as e:
             raise Exception(f"Error reconstructing file: {str(e)}")
 
-    def hide_data_in_image(self, cover_image_path: str, secret_file_path: str, output_image_path: str):
-        try:
-            cover_image = cv2.imread(cover_image_path)
-            if cover_image is None:
-                raise Exception("Could not load cover image")
-            binary_data = self.file_to_binary(secret_file_path)
-            image_capacity = cover_image.shape[0] * cover_image.shape[1] * 3
-            if len(binary_data) > image_capacity:
-                raise Exception(f"Image too small. Need {len(binary_data)} bits, but image can hold {image_capacity} bits")
-            flat_image = cover_image.flatten()
-            for i, bit in enumerate(binary_data):
-                flat_image[i] = (flat_image[i] & 0xFE) | int(bit)
-            stego_image = flat_image.reshape(cover_image.shape)
-            cv2.imwrite(output_image_path, stego_image)
+    def _read_header(self, reader: LSBReader, capacity_samples: int, read_index: bool = True):
+        if capacity_samples < HEADER_PREFIX.size * 8:
+            return None
+        magic, version = HEADER_PREFIX.unpack(reader.read_bytes(HEADER_PREFIX.size).tobytes())
+        if magic != HEADER_MAGIC:
+            return None
+        if version not in HEADER_LAYOUTS:
+            raise Exception(f"Unsupported stego format version {version}")
+        layout, fields = HEADER_LAYOUTS[version]
+        header_size = HEADER_PREFIX.size + layout.size
+        if capacity_samples < header_size * 8:
+            raise Exception("Truncated stego header")
+        header = dict(zip(fields, layout.unpack(reader.read_bytes(layout.size).tobytes())))
+        file_ext = b""
+        if header.get('ext_length'):
+            file_ext = reader.read_bytes(header['ext_length']).tobytes()
+            header_size += header['ext_length']
+        header.setdefault('bits_per_channel', 1)
+        header.setdefault('set_id', 0)
+        header.setdefault('shard_index', 0)
+        header.setdefault('shard_count', 1)
+        header.setdefault('codec', 0)
+        header.setdefault('original_length', header['length'])
+        header.setdefault('chunk_size', 0)
+        header.setdefault('chunk_count', 0)
+        if header['chunk_size']:
+            index_size = header['chunk_count'] * INDEX_ENTRY.size
+            if header['chunk_count'] != -(-header['original_length'] // header['chunk_size']):
+                raise Exception("Chunk count does not match payload length in stego header")
+            if capacity_samples < (header_size + index_size) * 8:
+                raise Exception("Truncated chunk index")
+            header_size += index_size
+            if read_index:
+                index = reader.read_bytes(index_size).tobytes()
+                if zlib.crc32(index) != header['crc32']:
+                    raise Exception("Chunk index is corrupted")
+                entries = np.frombuffer(index, dtype='>u4').reshape(-1, 2)
+                header['chunk_offsets'] = np.concatenate([[0], np.cumsum(entries[:, 0], dtype=np.int64)])
+                header['chunk_crcs'] = entries[:, 1].astype(np.int64)
+                if header['chunk_offsets'][-1] != header['length']:
+                    raise Exception("Chunk index does not match payload length")
+        if header['codec'] >= len(CODECS):
+            raise Exception(f"Unknown compression codec {header['codec']} in stego header")
+        header['codec'] = CODECS[header['codec']]
+        if not 1 <= header['bits_per_channel'] <= MAX_BITS_PER_CHANNEL:
+            raise Exception(f"Invalid bits per channel {header['bits_per_channel']} in stego header")
+        header.update(version=version, ext=file_ext.decode('utf-8', errors='replace'), size=header_size)
+        return header
+
+    def _extract_legacy(self, reader: LSBReader, capacity_samples: int) -> bytes:
+        capacity_bytes = capacity_samples // 8
+        if capacity_bytes < LEGACY_PROBE_BYTES:
+            raise Exception("No hidden data found")
+        probe = reader.read_bytes(LEGACY_PROBE_BYTES).tobytes()
+        if not LEGACY_PREFIX.match(probe):
+            raise Exception("No hidden data found")
+        data = probe + reader.read_bytes(capacity_bytes - LEGACY_PROBE_BYTES).tobytes()
+        end = data.find(self.delimiter.encode('utf-8'))
+        if end == -1:
+            raise Exception("No end-of-file delimiter found")
+        return data[:end]
+
+    def _check_capacity(self, header_size: int, length: int, bits_per_channel: int, capacity_samples: int):
+        needed = required_samples(header_size, length, bits_per_channel)
+        if needed > capacity_samples:
+            raise Exception(f"Image too small. Need {needed} channel values at {bits_per_channel} bit(s) per channel, "
+                            f"but image has {capacity_samples}")
+
+    def _locate_payload(self, image: np.ndarray, band_bytes: int = None, workers: int = None):
+        """Return (header, decoded chunks) for the payload, or (None, file_info) for the legacy formats.
+
+        The image is read in bands of band_bytes when given, chunks included, otherwise as one flat block.
+        """
+        if band_bytes:
+            return self._locate_stream(lambda: self._iter_bands(image, band_bytes), image.size, workers=workers,
+                                       band_bytes=band_bytes)
+        return self._locate_stream(lambda: [image.reshape(-1)], image.size, image, workers)
+
+    def _locate_stream(self, make_blocks, capacity_samples: int, image: np.ndarray = None, workers: int = None,
+                       band_bytes: int = None):
+        """_locate_payload over any sequence of sample blocks.
+
+        Chunked payloads are read at their offsets in image when it is given, otherwise in order from the
+        blocks, so no block past the end of the payload is ever requested. band_bytes bounds the samples
+        read at once and the chunks decoded at once.
+        """
+        reader = self._band_reader(make_blocks(), band_bytes)
+        header = self._read_header(reader, capacity_samples)
+        if header is None:
+            return None, self._extract_legacy(self._band_reader(make_blocks(), band_bytes), capacity_samples)
+        if required_samples(header['size'], header['length'], header['bits_per_channel']) > capacity_samples:
+            raise Exception("Declared payload length exceeds image capacity")
+        if header['shard_count'] > 1:
+            raise Exception(f"Image holds shard {header['shard_index'] + 1} of {header['shard_count']}, "
+                            f"extract it together with the other shards")
+        if header['chunk_size']:
+            workers = self._chunk_workers(header, band_bytes, workers, sequential=image is None)
+            if image is None:
+                return header, self._iter_container(None, header, workers=workers, reader=reader)
+            return header, self._iter_container(image, header, workers=workers)
+        reader.set_bits_per_channel(header['bits_per_channel'])
+        if header['version'] == 1:
+            return None, reader.read_bytes(header['length']).tobytes()
+        chunks = self._track_progress(reader.iter_bytes(header['length']), 'extract', header['length'])
+        return header, self._decode_chunks(chunks, header['codec'], header['original_length'], header['crc32'])
+
+    def _band_reader(self, blocks, band_bytes: int = None):
+        # each read unpacks 8 / bits_per_channel samples per byte, so band_bytes / 8 keeps a read within a band
+        return LSBReader(blocks, max(1, band_bytes // 8) if band_bytes else CHUNK_BYTES)
+
+    def _chunk_workers(self, header: dict, band_bytes: int = None, workers: int = None, sequential: bool = True):
+        """Decode workers for a chunked payload; with band_bytes, the two chunks per worker that ordered_map
+        keeps in flight (stored and decoded, plus their samples when read at offsets) stay within it."""
+        workers = workers or os.cpu_count() or 1
+        if not band_bytes:
+            return workers
+        chunk_bytes = 2 * header['chunk_size']
+        if not sequential:
+            chunk_bytes += 2 * header['chunk_size'] * 8 // header['bits_per_channel']
+        return max(1, min(workers, band_bytes // (2 * chunk_bytes)))
+
+    def _extract_stream(self, image: np.ndarray, output_file_path: str, band_bytes: int = None):
+        header, payload = self._locate_payload(image, band_bytes)
+        if header is None:
+            return self.legacy_payload_to_file(payload, output_file_path)
+        return self.payload_to_file(header, payload, output_file_path)
+
+    def open_memmap_image(self, image_path: str, writable: bool = False):
+        mode = 'r+' if writable else 'r'
+        ext = os.path.splitext(image_path)[1].lower()
+        if ext == '.npy':
+            memmap = np.load(image_path, mmap_mode=mode)
+            if memmap.dtype != np.uint8 or not memmap.flags.c_contiguous:
+                raise Exception("Only C-ordered uint8 .npy arrays can be streamed")
+            return memmap, memmap
+        if ext == '.bmp':
+            with open(image_path, 'rb') as file:
+                file_header = file.read(54)
+            if len(file_header) < 54 or file_header[:2] != b"BM":
+                raise Exception("Not a BMP file")
+            pixel_offset, = struct.unpack_from("<I", file_header, 10)
+            width, height = struct.unpack_from("<ii", file_header, 18)
+            bit_count, compression = struct.unpack_from("<HI", file_header, 28)
+            if bit_count not in (24, 32) or compression not in (0, 3):
+                raise Exception("Only uncompressed 24/32-bit BMP files can be streamed")
+            channels = bit_count // 8
+            row_stride = (width * bit_count + 31) // 32 * 4
+            memmap = np.memmap(image_path, dtype=np.uint8, mode=mode, offset=pixel_offset,
+                               shape=(abs(height), row_stride))
+            image = memmap[:, :width * channels].reshape(abs(height), width, channels)
+            if height > 0:
+                image = image[::-1]
+            return memmap, image[:, :, :3]
+        if ext in ('.tif', '.tiff'):
+            try:
+                import tifffile
+            except ImportError:
+                raise Exception("Streaming TIFF covers requires the tifffile package")
+            memmap = tifffile.memmap(image_path, mode=mode)
+            if memmap.dtype != np.uint8:
+                raise Exception("Only 8-bit uncompressed TIFF files can be streamed")
+            if memmap.ndim == 3 and memmap.shape[2] >= 3:
+                return memmap, memmap[:, :, 2::-1]
+            return memmap, memmap
+        raise Exception(f"Streaming mode supports {', '.join(STREAMABLE_EXTENSIONS)} images")
+
+    def _iter_bands(self, image: np.ndarray, band_bytes: int, writable: bool = False):
+        row_size = image[0].size if image.ndim > 1 else 1
+        band_rows = max(1, band_bytes // row_size)
+        for row in range(0, image.shape[0], band_rows):
+            band = image[row:row + band_rows]
+            flat_band = band.reshape(-1)
+            try:
+                yield flat_band
+            finally:
+                if writable and not np.shares_memory(flat_band, image):
+                    band[...] = flat_band.reshape(band.shape)
+
+    def image_dimensions(self, image_path: str):
+        with open(image_path, 'rb') as file:
+            dimensions = header_dimensions(file.read(32))
+        if dimensions is not None:
+            return dimensions
+        image = self.load_image(image_path)
+        if image is None:
+            raise Exception(f"Could not load image {os.path.basename(image_path)}")
+        return image.shape[:2]
+
+    def load_image(self, image_path: str, writable: bool = False):
+        if self.image_cache is None:
+            return cv2.imread(image_path)
+        image = self.image_cache.load(image_path)
+        if image is not None and writable:
+            image = image.copy()
+        return image
+
+    def _save_image(self, image_path: str, image: np.ndarray):
+        if not cv2.imwrite(image_path, image):
+            return False
+        if self.image_cache is not None:
+            if os.path.splitext(image_path)[1].lower() in LOSSLESS_EXTENSIONS:
+                self.image_cache.store(image_path, image)
+            else:
+                self.image_cache.invalidate(image_path)
+        return True
+
+    def decode_image(self, image_data):
+        image = cv2.imdecode(np.frombuffer(image_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise Exception("Could not decode image data")
+        return image
+
+    def encode_image(self, image: np.ndarray, image_format: str = '.png', level: int = None):
+        """Encode losslessly in memory, returning a memoryview over the encoded buffer.
+
+        level is the PNG compression level (0-9, default 3); for TIFF 0 disables LZW compression.
+        """
+        image_format = image_format.lower()
+        if not image_format.startswith('.'):
+            image_format = '.' + image_format
+        if image_format == '.png':
+            params = [cv2.IMWRITE_PNG_COMPRESSION, DEFAULT_PNG_LEVEL if level is None else level]
+        elif image_format == '.webp':
+            params = [cv2.IMWRITE_WEBP_QUALITY, WEBP_LOSSLESS_QUALITY]
+        elif image_format in ('.tif', '.tiff'):
+            params = [cv2.IMWRITE_TIFF_COMPRESSION, TIFF_COMPRESSION_NONE if level == 0 else TIFF_COMPRESSION_LZW]
+        else:
+            raise Exception(f"Unsupported output format {image_format!r}, expected one of {', '.join(ENCODE_FORMATS)}")
+        success, encoded = cv2.imencode(image_format, image, params)
+        if not success:
+            raise Exception(f"Could not encode image as {image_format}")
+        return encoded.data
+
+    def capacity(self, height: int, width: int, file_ext: str = ''):
+        """Payload bytes that fit in a height x width cover at each density, allowing for the chunk index."""
+        header_size = len(self.build_header(0, 0, file_ext))
+        capacity_samples = height * width * 3
+        capacity = {}
+        for bits_per_channel in range(1, MAX_BITS_PER_CHANNEL + 1):
+            payload_bytes = max(0, (capacity_samples - header_size * 8) * bits_per_channel // 8)
+            index_size = -(-payload_bytes // PAYLOAD_CHUNK_BYTES) * INDEX_ENTRY.size
+            capacity[bits_per_channel] = max(0, (capacity_samples - (header_size + index_size) * 8)
+                                             * bits_per_channel // 8)
+        return capacity
+
+    def _probe_samples(self, image_path: str):
+        ext = os.path.splitext(image_path)[1].lower()
+        if ext == '.png':
+            with open(image_path, 'rb') as file:
+                probe = read_png_prefix(file, PROBE_SAMPLES)
+            if probe is not None:
+                return probe
+        elif ext in STREAMABLE_EXTENSIONS:
+            try:
+                memmap, image = self.open_memmap_image(image_path)
+            except Exception:
+                image = None
+            if image is not None:
+                rows = min(image.shape[0], -(-PROBE_SAMPLES // (image.shape[1] * 3)))
+                return np.ascontiguousarray(image[:rows]).reshape(-1)[:PROBE_SAMPLES], image.shape[:2]
+        image = self.load_image(image_path)
+        if image is None:
+            raise Exception(f"Could not load image {os.path.basename(image_path)}")
+        return image.reshape(-1)[:PROBE_SAMPLES], image.shape[:2]
+
+    def probe_image(self, image_path: str):
+        """Report dimensions, capacity and any hidden payload header without a full extraction.
+
+        Only the first few hundred LSBs are read; PNG, BMP, NPY and TIFF files are not fully decoded.
+        """
+        result = {'path': image_path}
+        try:
+            samples, (height, width) = self._probe_samples(image_path)
+            capacity_samples = height * width * 3
+            result.update(width=width, height=height, capacity=self.capacity(height, width), payload=None)
+            try:
+                header = self._read_header(LSBReader([samples]), capacity_samples, read_index=False)
+            except Exception as e:
+                result['payload'] = {'error': str(e)}
+                return result
+            if header is not None:
+                result['payload'] = {
+                    'format': 'legacy-base64' if header['version'] == 1 else 'stego',
+                    'version': header['version'],
+                    'ext': header['ext'],
+                    'length': header['length'],
+                    'original_length': header['original_length'],
+                    'codec': header['codec'],
+                    'bits_per_channel': header['bits_per_channel'],
+                    'shard_index': header['shard_index'],
+                    'shard_count': header['shard_count'],
+                    'chunk_size': header['chunk_size'],
+                    'chunk_count': header['chunk_count'],
+                    'fits': required_samples(header['size'], header['length'],
+                                             header['bits_per_channel']) <= capacity_samples
+                }
+            elif samples.size >= LEGACY_PROBE_BYTES * 8:
+                match = LEGACY_PREFIX.match(np.packbits(samples[:LEGACY_PROBE_BYTES * 8] & 1).tobytes())
+                if match:
+                    result['payload'] = {'format': 'legacy-delimiter', 'version': 0,
+                                         'ext': (match.group(1) or b"").decode('utf-8', errors='replace')}
+        except Exception as e:
+            result['error'] = str(e)
+        return result
+
+    def probe_paths(self, paths, workers: int = None):
+        """Probe image files and every image below the given directories, yielding results in order."""
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(self.probe_image, iter_image_files(paths, PROBE_EXTENSIONS))
+
+    def _embed_payload(self, image: np.ndarray, header: bytes, file_data, bits_per_channel: int):
+        self._check_capacity(len(header), len(file_data), bits_per_channel, image.size)
+        writer = LSBWriter([image.reshape(-1)])
+        writer.write_bytes(header)
+        writer.set_bits_per_channel(bits_per_channel)
+        view = memoryview(file_data)
+        for offset in range(0, len(view), CHUNK_BYTES):
+            writer.write_bytes(view[offset:offset + CHUNK_BYTES])
+            self._progress('embed', min(offset + CHUNK_BYTES, len(view)), len(view))
+        writer.close()
+
+    def hide_data_in_image(self, cover_image_path: str, secret_file_path: str, output_image_path: str,
+                           bits_per_channel: int = 1, compression: str = 'none', compression_level: int = None):
+        try:
+            with self._stage('serialize') as stage:
+                header, file_data = self.file_to_payload(secret_file_path, bits_per_channel, compression,
+                                                         compression_level)
+                stage['bytes'] = len(file_data)
+            if os.path.splitext(cover_image_path)[1].lower() in TIFF_EXTENSIONS and cv2.imcount(cover_image_path) > 1:
+                raise Exception(f"{os.path.basename(cover_image_path)} has {cv2.imcount(cover_image_path)} pages "
+                                f"and only the first would be kept, use hide_data_in_frames to use them all")
+            with open(cover_image_path, 'rb') as file:
+                dimensions = header_dimensions(file.read(32))
+            if dimensions is not None:
+                # fail before paying for the decode when the header already shows the cover is too small
+                self._check_capacity(len(header), len(file_data), bits_per_channel, dimensions[0] * dimensions[1] * 3)
+            with self._stage('decode') as stage:
+                cover_image = self.load_image(cover_image_path, writable=True)
+                if cover_image is None:
+                    raise Exception("Could not load cover image")
+                stage['bytes'] = cover_image.nbytes
+            with self._stage('embed', len(file_data)):
+                self._embed_payload(cover_image, header, file_data, bits_per_channel)
+            with self._stage('encode', cover_image.nbytes):
+                if not self._save_image(output_image_path, cover_image):
+                    raise Exception(f"Could not write {os.path.basename(output_image_path)}")
             print(f"Successfully hid {os.path.basename(secret_file_path)} in {os.path.basename(cover_image_path)}")
             print(f"Stego image saved as: {output_image_path}")
             return output_image_path
@@ -63,30 +1133,456 @@ class SteganographyTool:
 
     def extract_data_from_image(self, stego_image_path: str, output_file_path: str):
         try:
-            stego_image = cv2.imread(stego_image_path)
-            if stego_image is None:
-                raise Exception("Could not load stego image")
-            flat_image = stego_image.flatten()
-            binary_data = ""
-            delimiter_binary = ''.join(format(ord(char), '08b') for char in self.delimiter)
-            for pixel_value in flat_image:
-                binary_data += str(pixel_value & 1)
-                if binary_data.endswith(delimiter_binary):
-                    binary_data = binary_data[:-len(delimiter_binary)]
-                    break
-            extracted_file_path = self.binary_to_file(binary_data, output_file_path)
+            with self._stage('decode') as stage:
+                stego_image = self.load_image(stego_image_path)
+                if stego_image is None:
+                    raise Exception("Could not load stego image")
+                stage['bytes'] = stego_image.nbytes
+            with self._stage('extract') as stage:
+                extracted_file_path = self._extract_stream(stego_image, output_file_path)
+                stage['bytes'] = os.path.getsize(extracted_file_path)
+            print(f"Successfully extracted data from {os.path.basename(stego_image_path)}")
+            print(f"Extracted file saved as: {extracted_file_path}")
+            return extracted_file_path
+        except Exception as e:
+            raise Exception(f"Error extracting data: {str(e)}")
+
+    def hide_bytes(self, cover_data, payload, file_ext: str = '', image_format: str = '.png', level: int = None,
+                   bits_per_channel: int = 1, compression: str = 'none', compression_level: int = None):
+        """Hide payload in an encoded cover image held in memory and return the encoded stego image."""
+        try:
+            with self._stage('decode') as stage:
+                cover_image = self.decode_image(cover_data)
+                stage['bytes'] = cover_image.nbytes
+            with self._stage('serialize') as stage:
+                header, file_data = self.bytes_to_payload(payload, file_ext, bits_per_channel, compression,
+                                                          compression_level)
+                stage['bytes'] = len(file_data)
+            with self._stage('embed', len(file_data)):
+                self._embed_payload(cover_image, header, file_data, bits_per_channel)
+            with self._stage('encode', cover_image.nbytes):
+                return self.encode_image(cover_image, image_format, level)
+        except Exception as e:
+            raise Exception(f"Error hiding data: {str(e)}")
+
+    def extract_bytes(self, stego_data):
+        """Extract the hidden file from an encoded stego image held in memory, returning (data, ext)."""
+        try:
+            with self._stage('decode') as stage:
+                stego_image = self.decode_image(stego_data)
+                stage['bytes'] = stego_image.nbytes
+            with self._stage('extract') as stage:
+                header, payload = self._locate_payload(stego_image)
+                if header is None:
+                    file_ext, file_data = self.parse_legacy_payload(payload)
+                else:
+                    file_ext = header['ext']
+                    file_data = b"".join(payload)
+                stage['bytes'] = len(file_data)
+            return file_data, file_ext
+        except Exception as e:
+            raise Exception(f"Error extracting data: {str(e)}")
+
+    def _open_stego(self, stego_image_path: str):
+        """Return (image, band_bytes), memory-mapping streamable formats so only the rows that are read get loaded."""
+        if os.path.splitext(stego_image_path)[1].lower() in STREAMABLE_EXTENSIONS:
+            try:
+                memmap, image = self.open_memmap_image(stego_image_path)
+                return image, DEFAULT_BAND_BYTES
+            except Exception:
+                pass
+        image = self.load_image(stego_image_path)
+        if image is None:
+            raise Exception("Could not load stego image")
+        return image, None
+
+    def verify_image(self, stego_image_path: str, workers: int = None):
+        """Check the hidden payload without writing it out, reporting exactly which chunks are corrupt.
+
+        Chunked payloads are verified in parallel; older formats are checked as a single chunk.
+        """
+        try:
+            image, band_bytes = self._open_stego(stego_image_path)
+            with self._stage('verify'):
+                header, payload = self._locate_payload(image, band_bytes, workers)
+                report = {'path': stego_image_path, 'version': header['version'] if header else 0,
+                          'codec': header['codec'] if header else 'none',
+                          'length': header['original_length'] if header else None,
+                          'chunk_size': header['chunk_size'] if header else 0,
+                          'chunk_count': header['chunk_count'] if header else 1, 'corrupt': []}
+                if header is not None and header['chunk_size']:
+                    if band_bytes:
+                        # read the chunks in order through the bands, past the header and index
+                        reader = self._band_reader(self._iter_bands(image, band_bytes), band_bytes)
+                        self._read_header(reader, image.size)
+                        scan = self._scan_chunks(None, header, workers=self._chunk_workers(header, band_bytes, workers),
+                                                 reader=reader)
+                    else:
+                        scan = self._scan_chunks(image, header, workers=workers)
+                    for index, _, error in scan:
+                        if error is not None:
+                            report['corrupt'].append(self._chunk_report(header, index, error))
+                else:
+                    try:
+                        if header is None:
+                            report['length'] = len(self.parse_legacy_payload(payload)[1])
+                        else:
+                            for _ in payload:
+                                pass
+                    except Exception as e:
+                        report['chunk_count'] = 1
+                        report['corrupt'].append({'index': 0, 'start': 0, 'end': report['length'], 'error': str(e)})
+            report['ok'] = not report['corrupt']
+            return report
+        except Exception as e:
+            raise Exception(f"Error verifying data: {str(e)}")
+
+    def extract_range(self, stego_image_path: str, offset: int, length: int = None, workers: int = None):
+        """Return length bytes of the hidden file starting at offset (to the end when length is None),
+        decoding only the chunks that cover them."""
+        try:
+            image, band_bytes = self._open_stego(stego_image_path)
+            with self._stage('extract', length):
+                header, _ = self._locate_payload(image, band_bytes, workers)
+                if header is None or not header['chunk_size']:
+                    raise Exception("Range extraction needs a chunked payload (format version 6 or later)")
+                if length is None:
+                    length = header['original_length'] - offset
+                if offset < 0 or length < 0 or offset + length > header['original_length']:
+                    raise Exception(f"Range {offset}+{length} is outside the {header['original_length']} byte payload")
+                if not length:
+                    return b""
+                first = offset // header['chunk_size']
+                last = (offset + length - 1) // header['chunk_size']
+                workers = self._chunk_workers(header, band_bytes, workers, sequential=False)
+                data = b"".join(self._iter_container(image, header, range(first, last + 1), workers))
+                start = offset - first * header['chunk_size']
+                return data[start:start + length]
+        except Exception as e:
+            raise Exception(f"Error extracting data: {str(e)}")
+
+    def _hide_shard(self, cover_image_path: str, output_image_path: str, header: bytes, shard_data,
+                    bits_per_channel: int):
+        cover_image = self.load_image(cover_image_path, writable=True)
+        if cover_image is None:
+            raise Exception(f"Could not load cover image {os.path.basename(cover_image_path)}")
+        self._embed_payload(cover_image, header, shard_data, bits_per_channel)
+        if not self._save_image(output_image_path, cover_image):
+            raise Exception(f"Could not write {os.path.basename(output_image_path)}")
+        return output_image_path
+
+    def hide_data_across_images(self, cover_image_paths, secret_file_path: str, output_image_paths,
+                                bits_per_channel: int = 1, workers: int = None, compression: str = 'none',
+                                compression_level: int = None):
+        try:
+            if len(cover_image_paths) != len(output_image_paths):
+                raise Exception("Need exactly one output path per cover image")
+            if len(cover_image_paths) > 0xFFFF:
+                raise Exception("Too many cover images")
+            with self._stage('serialize') as stage:
+                codec, file_data, original_length = self.load_payload(secret_file_path, compression,
+                                                                      compression_level)
+                file_data = memoryview(file_data)
+                stage['bytes'] = len(file_data)
+            file_ext = os.path.splitext(secret_file_path)[1]
+            header_size = len(self.build_header(0, 0, file_ext, bits_per_channel))
+            capacities = []
+            for path in cover_image_paths:
+                height, width = self.image_dimensions(path)
+                capacities.append(max(0, (height * width * 3 - header_size * 8) * bits_per_channel // 8))
+            total_capacity = sum(capacities)
+            if len(file_data) > total_capacity:
+                raise Exception(f"Cover images too small. Need {len(file_data)} bytes, "
+                                f"but they can hold {total_capacity} bytes")
+            set_id = int.from_bytes(os.urandom(8), 'big')
+            shard_count = len(cover_image_paths)
+            boundaries = [0]
+            filled = 0
+            for capacity in capacities:
+                filled += capacity
+                boundaries.append(len(file_data) * filled // total_capacity)
+            with self._stage('embed', len(file_data)), ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = []
+                for index, (cover_path, output_path) in enumerate(zip(cover_image_paths, output_image_paths)):
+                    shard_data = file_data[boundaries[index]:boundaries[index + 1]]
+                    header = self.build_header(len(shard_data), zlib.crc32(shard_data), file_ext, bits_per_channel,
+                                               set_id, index, shard_count, codec, original_length)
+                    futures.append(executor.submit(self._hide_shard, cover_path, output_path, header, shard_data,
+                                                   bits_per_channel))
+                output_paths = []
+                for future in futures:
+                    output_paths.append(future.result())
+                    self._progress('embed', boundaries[len(output_paths)], len(file_data))
+            print(f"Successfully hid {os.path.basename(secret_file_path)} across {shard_count} images")
+            return output_paths
+        except Exception as e:
+            raise Exception(f"Error hiding data: {str(e)}")
+
+    def _extract_shard(self, stego_image_path: str):
+        stego_image = self.load_image(stego_image_path)
+        if stego_image is None:
+            raise Exception(f"Could not load stego image {os.path.basename(stego_image_path)}")
+        flat_image = stego_image.reshape(-1)
+        reader = LSBReader([flat_image])
+        header = self._read_header(reader, flat_image.size)
+        if header is None or header['version'] < 2:
+            raise Exception(f"{os.path.basename(stego_image_path)} does not contain a payload shard")
+        if required_samples(header['size'], header['length'], header['bits_per_channel']) > flat_image.size:
+            raise Exception("Declared payload length exceeds image capacity")
+        reader.set_bits_per_channel(header['bits_per_channel'])
+        shard_data = reader.read_bytes(header['length'])
+        if zlib.crc32(shard_data) != header['crc32']:
+            raise Exception(f"Checksum mismatch in shard {header['shard_index'] + 1} "
+                            f"({os.path.basename(stego_image_path)})")
+        return header, shard_data
+
+    def extract_data_from_images(self, stego_image_paths, output_file_path: str, workers: int = None):
+        try:
+            with self._stage('extract'), ThreadPoolExecutor(max_workers=workers) as executor:
+                shards = []
+                for shard in executor.map(self._extract_shard, stego_image_paths):
+                    shards.append(shard)
+                    self._progress('extract', len(shards), len(stego_image_paths))
+            first = shards[0][0]
+            shards.sort(key=lambda shard: shard[0]['shard_index'])
+            if any(header['set_id'] != first['set_id'] for header, _ in shards):
+                raise Exception("Images belong to different shard sets")
+            indices = [header['shard_index'] for header, _ in shards]
+            if indices != list(range(first['shard_count'])):
+                missing = sorted(set(range(first['shard_count'])) - set(indices))
+                if missing:
+                    raise Exception(f"Missing shards: {', '.join(str(index + 1) for index in missing)}")
+                raise Exception("Duplicate shards supplied")
+            if not output_file_path.endswith(first['ext']):
+                output_file_path += first['ext']
+            original_length = first['original_length']
+            if first['version'] < 5:
+                original_length = sum(header['length'] for header, _ in shards)
+            self._write_payload(output_file_path, (shard_data for _, shard_data in shards), first['codec'],
+                                original_length)
+            print(f"Successfully extracted data from {len(shards)} images")
+            print(f"Extracted file saved as: {output_file_path}")
+            return output_file_path
+        except Exception as e:
+            raise Exception(f"Error extracting data: {str(e)}")
+
+    def hide_data_in_image_streaming(self, cover_image_path: str, secret_file_path: str, output_image_path: str,
+                                     band_bytes: int = DEFAULT_BAND_BYTES, bits_per_channel: int = 1,
+                                     compression: str = 'none', compression_level: int = None):
+        try:
+            cover_ext = os.path.splitext(cover_image_path)[1].lower()
+            if os.path.splitext(output_image_path)[1].lower() != cover_ext:
+                raise Exception("Streaming output must use the same format as the cover image")
+            with self._stage('serialize') as stage:
+                header, source, length = self.spool_payload(secret_file_path, bits_per_channel, compression,
+                                                            compression_level)
+                stage['bytes'] = length
+            with source:
+                memmap, image = self.open_memmap_image(cover_image_path)
+                self._check_capacity(len(header), length, bits_per_channel, image.size)
+                del memmap, image
+                shutil.copyfile(cover_image_path, output_image_path)
+                try:
+                    with self._stage('embed', length):
+                        memmap, image = self.open_memmap_image(output_image_path, writable=True)
+                        writer = LSBWriter(self._iter_bands(image, band_bytes, writable=True))
+                        writer.write_bytes(header)
+                        self._write_spooled(writer, source, length, bits_per_channel)
+                    memmap.flush()
+                    del memmap, image
+                except Exception:
+                    os.remove(output_image_path)
+                    raise
+            print(f"Successfully hid {os.path.basename(secret_file_path)} in {os.path.basename(cover_image_path)}")
+            print(f"Stego image saved as: {output_image_path}")
+            return output_image_path
+        except Exception as e:
+            raise Exception(f"Error hiding data: {str(e)}")
+
+    def extract_data_from_image_streaming(self, stego_image_path: str, output_file_path: str,
+                                          band_bytes: int = DEFAULT_BAND_BYTES):
+        try:
+            memmap, image = self.open_memmap_image(stego_image_path)
+            with self._stage('extract') as stage:
+                extracted_file_path = self._extract_stream(image, output_file_path, band_bytes)
+                stage['bytes'] = os.path.getsize(extracted_file_path)
+            del memmap, image
             print(f"Successfully extracted data from {os.path.basename(stego_image_path)}")
             print(f"Extracted file saved as: {extracted_file_path}")
             return extracted_file_path
         except Exception as e:
             raise Exception(f"Error extracting data: {str(e)}")
 
-    def analyze_images(self, original_path: str, stego_path: str):
+    def hide_data_in_frames(self, cover_path: str, secret_file_path: str, output_path: str,
+                            bits_per_channel: int = 1, compression: str = 'none', compression_level: int = None):
+        """Hide a file across the frames of a numbered PNG directory, a multi-page TIFF or a video.
+
+        Frames are decoded, embedded and written one at a time; frames past the end of the payload are
+        copied unchanged. The output is a PNG directory, a multi-page TIFF or an FFV1 .mkv/.avi video.
+        """
+        try:
+            with self._stage('serialize') as stage:
+                header, source, length = self.spool_payload(secret_file_path, bits_per_channel, compression,
+                                                            compression_level)
+                stage['bytes'] = length
+            with source:
+                sequence = FrameSequence(cover_path)
+                self._check_capacity(len(header), length, bits_per_channel, sequence.samples)
+                output = FrameWriter(output_path, sequence)
+                try:
+                    frames = sequence.frames()
+                    current = []
+
+                    def blocks():
+                        for frame in frames:
+                            # the LSB writer only asks for the next frame once it is done with this one
+                            if current:
+                                output.write(current.pop())
+                            current.append(frame)
+                            yield frame.reshape(-1)
+
+                    with self._stage('embed', length):
+                        writer = LSBWriter(blocks())
+                        writer.write_bytes(header)
+                        self._write_spooled(writer, source, length, bits_per_channel)
+                    with self._stage('encode'):
+                        # the frame holding the end of the payload, then the untouched rest
+                        if current:
+                            output.write(current.pop())
+                        sequence.copy_remaining(output, frames)
+                        output.close()
+                except Exception:
+                    output.remove()
+                    raise
+            print(f"Successfully hid {os.path.basename(secret_file_path)} in {output.count} frames "
+                  f"of {os.path.basename(os.path.normpath(cover_path))}")
+            print(f"Stego frames saved as: {output_path}")
+            return output_path
+        except Exception as e:
+            raise Exception(f"Error hiding data: {str(e)}")
+
+    def extract_data_from_frames(self, stego_path: str, output_file_path: str, workers: int = None):
+        """Extract a file hidden by hide_data_in_frames, decoding frames only until the payload is complete."""
+        try:
+            sequence = FrameSequence(stego_path)
+            with self._stage('extract') as stage:
+                header, payload = self._locate_stream(lambda: (frame.reshape(-1) for frame in sequence.frames()),
+                                                      sequence.samples, workers=workers)
+                if header is None:
+                    extracted_file_path = self.legacy_payload_to_file(payload, output_file_path)
+                else:
+                    extracted_file_path = self.payload_to_file(header, payload, output_file_path)
+                stage['bytes'] = os.path.getsize(extracted_file_path)
+            print(f"Successfully extracted data from {sequence.position} of {sequence.count} frames")
+            print(f"Extracted file saved as: {extracted_file_path}")
+            return extracted_file_path
+        except Exception as e:
+            raise Exception(f"Error extracting data: {str(e)}")
+
+    def estimate_density_quality(self, header_size: int, length: int, capacity_samples: int):
+        estimates = []
+        for bits_per_channel in range(1, MAX_BITS_PER_CHANNEL + 1):
+            payload_samples = required_samples(0, length, bits_per_channel)
+            expected_error = header_size * 8 * 0.5 + payload_samples * (4 ** bits_per_channel - 1) / 6
+            mse = expected_error / capacity_samples
+            estimates.append({
+                'bits_per_channel': bits_per_channel,
+                'fits': header_size * 8 + payload_samples <= capacity_samples,
+                'changed_values': header_size * 8 + payload_samples,
+                'mse': mse,
+                'psnr': 20 * np.log10(255.0 / np.sqrt(mse)) if mse else float('inf')
+            })
+        return estimates
+
+    def compute_quality_metrics(self, original, stego, ssim_stride: int = 1):
+        """Compare two decoded images in row bands, using integer sums for the error and count metrics.
+
+        SSIM is computed on every ssim_stride-th row and column only; the other metrics always use every pixel.
+        """
+        if original.shape != stego.shape:
+            raise Exception(f"Images have different dimensions: {original.shape} vs {stego.shape}")
+        if original.dtype != np.uint8 or stego.dtype != np.uint8:
+            raise Exception("Only 8-bit images can be compared")
+        if original.ndim == 2:
+            original = original[:, :, None]
+            stego = stego[:, :, None]
+        height, width, channels = original.shape
+        if channels not in CHANNEL_NAMES:
+            raise Exception("Only images with 1 to 4 channels can be compared")
+        names = CHANNEL_NAMES[channels]
+        squared_error = np.zeros(channels, dtype=np.int64)
+        changed_values = np.zeros(channels, dtype=np.int64)
+        changed_lsbs = np.zeros(channels, dtype=np.int64)
+        ssim_total = np.zeros(channels, dtype=np.float64)
+        histograms = {'original': np.zeros((channels, 256), dtype=np.int64),
+                      'stego': np.zeros((channels, 256), dtype=np.int64)}
+        stride = max(1, ssim_stride)
+        ssim_samples = 0
+        # bands start on a stride boundary so the strided SSIM grid is the same in every band
+        band_rows = -(-max(1, METRICS_BAND_SAMPLES // (width * channels)) // stride) * stride
+        halo = SSIM_RADIUS * stride
+        total = original.size + stego.size
+        for top in range(0, height, band_rows):
+            bottom = min(height, top + band_rows)
+            halo_top = max(0, top - halo)
+            original_band = np.ascontiguousarray(original[halo_top:bottom + halo])
+            stego_band = np.ascontiguousarray(stego[halo_top:bottom + halo])
+            inner = slice(top - halo_top, bottom - halo_top)
+            ssim_inner = slice((top - halo_top) // stride, -(-(bottom - halo_top) // stride))
+            inner_samples = (ssim_inner.stop - ssim_inner.start) * -(-width // stride)
+            difference = cv2.absdiff(original_band, stego_band)
+            for channel in range(channels):
+                for name, band in (('original', original_band), ('stego', stego_band)):
+                    histograms[name][channel] += band_histogram(band[inner], channel)
+                # |a - b| is odd exactly when the LSBs differ, so one histogram gives all three counts
+                differences = band_histogram(difference[inner], channel)
+                squared_error[channel] += differences @ SQUARES
+                changed_values[channel] += differences[1:].sum()
+                changed_lsbs[channel] += differences[1::2].sum()
+            if cv2.countNonZero(difference.reshape(difference.shape[0], -1)):
+                ssim_total += cv2.sumElems(ssim_map(original_band[::stride, ::stride],
+                                                    stego_band[::stride, ::stride])[ssim_inner])[:channels]
+            else:
+                # identical windows score exactly 1, so unchanged bands skip the filtering
+                ssim_total += inner_samples
+            ssim_samples += inner_samples
+            self._progress('metrics', 2 * bottom * width * channels, total)
+        samples = height * width
+        per_channel = []
+        for channel, name in enumerate(names):
+            mse = squared_error[channel] / samples
+            per_channel.append({
+                'channel': name,
+                'mse': float(mse),
+                'psnr': float(psnr_from_mse(mse)),
+                'ssim': float(ssim_total[channel] / ssim_samples),
+                'changed_values': int(changed_values[channel]),
+                'changed_lsbs': int(changed_lsbs[channel])
+            })
+        mse = squared_error.sum() / (samples * channels)
+        return {
+            'width': width,
+            'height': height,
+            'mse': float(mse),
+            'psnr': float(psnr_from_mse(mse)),
+            'ssim': float(ssim_total.sum() / (ssim_samples * channels)),
+            'ssim_stride': stride,
+            'changed_values': int(changed_values.sum()),
+            'changed_lsbs': int(changed_lsbs.sum()),
+            'channels': per_channel,
+            'histograms': histograms
+        }
+
+    def analyze_images(self, original_path: str, stego_path: str, ssim_max_side: int = None):
+        """Compare an original with its stego image; ssim_max_side computes SSIM on a strided preview of
+        about that many pixels on the long side, as the Analysis tab does, instead of at full resolution."""
         try:
-            original = cv2.imread(original_path)
-            stego = cv2.imread(stego_path)
-            if original is None or stego is None:
-                raise Exception("Could not load images for analysis")
+            with self._stage('decode') as stage:
+                original = self.load_image(original_path)
+                stego = self.load_image(stego_path)
+                if original is None or stego is None:
+                    raise Exception("Could not load images for analysis")
+                stage['bytes'] = original.nbytes + stego.nbytes
             original_size = os.path.getsize(original_path)
             stego_size = os.path.getsize(stego_path)
             print("\n=== IMAGE ANALYSIS RESULTS ===")
@@ -94,25 +1590,52 @@ class SteganographyTool:
             print(f"Stego image size: {stego_size:,} bytes ({stego_size/1024:.2f} KB)")
             print(f"Size difference: {stego_size - original_size:,} bytes")
             print(f"Size change: {((stego_size - original_size) / original_size * 100):+.2f}%")
-            mse = np.mean((original.astype(float) - stego.astype(float)) ** 2)
-            if mse == 0:
-                psnr = float('inf')
-            else:
-                psnr = 20 * np.log10(255.0 / np.sqrt(mse))
+            with self._stage('metrics', original.nbytes + stego.nbytes):
+                ssim_stride = max(1, max(original.shape[:2]) // ssim_max_side) if ssim_max_side else 1
+                metrics = self.compute_quality_metrics(original, stego, ssim_stride)
+            mse = metrics['mse']
+            psnr = metrics['psnr']
             print(f"\nImage Quality Metrics:")
             print(f"MSE (Mean Squared Error): {mse:.4f}")
             print(f"PSNR (Peak Signal-to-Noise Ratio): {psnr:.2f} dB")
+            strided = f" (preview, 1 in {metrics['ssim_stride']} rows and columns)" if metrics['ssim_stride'] > 1 else ""
+            print(f"SSIM (Structural Similarity): {metrics['ssim']:.6f}{strided}")
+            print(f"Changed values: {metrics['changed_values']:,} ({metrics['changed_lsbs']:,} LSBs flipped)")
+            for channel in metrics['channels']:
+                print(f"  {channel['channel']:<6} MSE {channel['mse']:.4f}, PSNR {channel['psnr']:.2f} dB, "
+                      f"SSIM {channel['ssim']:.6f}, {channel['changed_lsbs']:,} LSBs flipped")
             if psnr > 30:
                 print("Quality: Excellent (visually identical)")
             elif psnr > 20:
                 print("Quality: Good (minimal visible difference)")
             else:
                 print("Quality: Poor (visible differences)")
+            try:
+                header = self._read_header(LSBReader([stego.reshape(-1)]), stego.size)
+            except Exception:
+                header = None
+            density_tradeoff = []
+            if header is not None:
+                density_tradeoff = self.estimate_density_quality(header['size'], header['length'], stego.size)
+                print(f"\nDensity Trade-off ({header['length']:,} byte payload, "
+                      f"embedded at {header['bits_per_channel']} bit(s) per channel):")
+                for estimate in density_tradeoff:
+                    fits = "" if estimate['fits'] else " (does not fit)"
+                    print(f"  {estimate['bits_per_channel']} bit(s): MSE {estimate['mse']:.4f}, "
+                          f"PSNR {estimate['psnr']:.2f} dB, {estimate['changed_values']:,} values{fits}")
             return {
                 'original_size': original_size,
                 'stego_size': stego_size,
                 'mse': mse,
-                'psnr': psnr
+                'psnr': psnr,
+                'ssim': metrics['ssim'],
+                'ssim_stride': metrics['ssim_stride'],
+                'changed_values': metrics['changed_values'],
+                'changed_lsbs': metrics['changed_lsbs'],
+                'channels': metrics['channels'],
+                'histograms': metrics['histograms'],
+                'bits_per_channel': header['bits_per_channel'] if header else None,
+                'density_tradeoff': density_tradeoff
             }
         except Exception as e:
             raise Exception(f"Error analyzing images: {str(e)}")
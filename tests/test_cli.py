@@ -0,0 +1,15 @@
+import json
+import cv2
+import numpy as np
+import steganography_cli
+
+def reject_constant(name):
+    raise ValueError(f"invalid JSON constant {name}")
+
+def test_analyze_json_is_strict_for_identical_images(tmp_path, capsys):
+    image_path = tmp_path / "cover.png"
+    cv2.imwrite(str(image_path), np.random.default_rng(3).integers(0, 256, size=(24, 24, 3), dtype=np.uint8))
+    assert steganography_cli.main(["analyze", str(image_path), str(image_path), "--json"]) == 0
+    analysis = json.loads(capsys.readouterr().out, parse_constant=reject_constant)
+    assert analysis['psnr'] is None
+    assert all(channel['psnr'] is None for channel in analysis['channels'])
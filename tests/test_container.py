@@ -0,0 +1,77 @@
+import contextlib
+import io
+import os
+import tracemalloc
+import cv2
+import numpy as np
+import pytest
+from steganography_tool import PAYLOAD_CHUNK_BYTES, SteganographyTool
+
+@pytest.fixture(scope="module")
+def bmp_stego(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("bmp")
+    rng = np.random.default_rng(7)
+    cv2.imwrite(str(folder / "cover.bmp"), rng.integers(0, 256, size=(1500, 1500, 3), dtype=np.uint8))
+    payload = rng.integers(0, 256, size=3 * PAYLOAD_CHUNK_BYTES + 1234, dtype=np.uint8).tobytes()
+    (folder / "payload.bin").write_bytes(payload)
+    with contextlib.redirect_stdout(io.StringIO()):
+        SteganographyTool().hide_data_in_image(str(folder / "cover.bmp"), str(folder / "payload.bin"),
+                                               str(folder / "stego.bmp"), bits_per_channel=4)
+    return folder / "stego.bmp", payload
+
+@pytest.mark.parametrize("cpus", [1, 16])
+def test_streaming_extract_memory_is_bounded_by_band(bmp_stego, tmp_path, monkeypatch, cpus):
+    stego_path, payload = bmp_stego
+    monkeypatch.setattr(os, 'cpu_count', lambda: cpus)
+    tool = SteganographyTool()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            output = tool.extract_data_from_image_streaming(str(stego_path), str(tmp_path / "out"),
+                                                            band_bytes=64 << 10)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    with open(output, 'rb') as file:
+        assert file.read() == payload
+    # reading the chunks at their offsets in parallel peaked at 27 MiB with one CPU and 78 MiB with 16
+    assert peak < 6 << 20
+
+@pytest.fixture(scope="module")
+def png_stego(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("png")
+    rng = np.random.default_rng(8)
+    cv2.imwrite(str(folder / "cover.png"), rng.integers(0, 256, size=(1200, 1200, 3), dtype=np.uint8))
+    payload = rng.integers(0, 256, size=2 * PAYLOAD_CHUNK_BYTES + 4321, dtype=np.uint8).tobytes()
+    (folder / "payload.bin").write_bytes(payload)
+    tool = SteganographyTool()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tool.hide_data_in_image(str(folder / "cover.png"), str(folder / "payload.bin"), str(folder / "stego.png"),
+                                bits_per_channel=4)
+    header, _ = tool.file_to_payload(str(folder / "payload.bin"), bits_per_channel=4)
+    return folder / "stego.png", payload, len(header)
+
+def test_extract_range_across_chunk_boundary(png_stego):
+    stego_path, payload, _ = png_stego
+    tool = SteganographyTool()
+    offset = PAYLOAD_CHUNK_BYTES - 100
+    assert tool.extract_range(str(stego_path), offset, 300) == payload[offset:offset + 300]
+    assert tool.extract_range(str(stego_path), 2 * PAYLOAD_CHUNK_BYTES + 5) == payload[2 * PAYLOAD_CHUNK_BYTES + 5:]
+    assert tool.extract_range(str(stego_path), 0) == payload
+
+def test_corrupt_chunk_is_reported_and_extraction_leaves_no_output(png_stego, tmp_path):
+    stego_path, _, header_size = png_stego
+    image = cv2.imread(str(stego_path))
+    # at 4 bits per channel, chunk 2 starts PAYLOAD_CHUNK_BYTES * 2 samples after the header
+    start = header_size * 8 + PAYLOAD_CHUNK_BYTES * 2 + 1000
+    image.reshape(-1)[start:start + 64] ^= 1
+    corrupted_path = tmp_path / "corrupted.png"
+    cv2.imwrite(str(corrupted_path), image)
+    tool = SteganographyTool()
+    report = tool.verify_image(str(corrupted_path))
+    assert not report['ok']
+    assert report['corrupt'] == [{'index': 1, 'start': PAYLOAD_CHUNK_BYTES, 'end': 2 * PAYLOAD_CHUNK_BYTES,
+                                  'error': "checksum mismatch"}]
+    with pytest.raises(Exception, match="1 of 3 chunks are corrupted: chunk 2"):
+        tool.extract_data_from_image(str(corrupted_path), str(tmp_path / "recovered"))
+    assert not (tmp_path / "recovered.bin").exists()
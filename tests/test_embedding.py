@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+import pytest
+from steganography_tool import SteganographyTool
+
+def embed_per_bit(flat_image: np.ndarray, binary_data: str):
+    # the original hide_data_in_image loop, kept as the reference the vectorized writer must match
+    for i, bit in enumerate(binary_data):
+        flat_image[i] = (flat_image[i] & 0xFE) | int(bit)
+
+def payload_bits(data: bytes) -> str:
+    return ''.join(format(byte, '08b') for byte in data)
+
+@pytest.fixture
+def cover():
+    return np.random.default_rng(1).integers(0, 256, size=(64, 80, 3), dtype=np.uint8)
+
+@pytest.fixture
+def payload():
+    return np.random.default_rng(2).integers(0, 256, size=1500, dtype=np.uint8).tobytes()
+
+def test_embed_payload_matches_per_bit_loop(cover, payload):
+    tool = SteganographyTool()
+    header, file_data = tool.bytes_to_payload(payload, '.bin')
+    expected = cover.copy()
+    embed_per_bit(expected.reshape(-1), payload_bits(bytes(header) + bytes(file_data)))
+    stego = cover.copy()
+    tool._embed_payload(stego, header, file_data, 1)
+    assert np.array_equal(stego, expected)
+
+def test_hide_data_in_image_png_bytes_match_per_bit_loop(cover, payload, tmp_path):
+    tool = SteganographyTool()
+    cover_path, secret_path, output_path = tmp_path / "cover.png", tmp_path / "secret.bin", tmp_path / "stego.png"
+    cv2.imwrite(str(cover_path), cover)
+    secret_path.write_bytes(payload)
+    tool.hide_data_in_image(str(cover_path), str(secret_path), str(output_path))
+    header, file_data = tool.file_to_payload(str(secret_path))
+    expected = cover.copy()
+    embed_per_bit(expected.reshape(-1), payload_bits(bytes(header) + bytes(file_data)))
+    assert output_path.read_bytes() == cv2.imencode('.png', expected)[1].tobytes()
@@ -0,0 +1,85 @@
+import base64
+import struct
+import zlib
+import cv2
+import numpy as np
+import pytest
+from steganography_tool import SteganographyTool
+
+# Headers exactly as earlier releases wrote them; deliberately not built from HEADER_LAYOUTS.
+DELIMITER = b"<<<END_OF_FILE>>>"
+PREFIX = struct.Struct(">4sB")
+EXT = ".pdf"
+
+def embed(cover: np.ndarray, header: bytes, data: bytes, bits_per_channel: int = 1):
+    """Header bits one per channel, then the data bits in bits_per_channel groups, most significant first."""
+    flat = cover.reshape(-1)
+    header_bits = np.unpackbits(np.frombuffer(header, dtype=np.uint8))
+    flat[:header_bits.size] = (flat[:header_bits.size] & 0xFE) | header_bits
+    data_bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    data_bits = np.concatenate([data_bits, np.zeros(-data_bits.size % bits_per_channel, dtype=np.uint8)])
+    weights = 1 << np.arange(bits_per_channel - 1, -1, -1)
+    values = (data_bits.reshape(-1, bits_per_channel) * weights).sum(axis=1).astype(np.uint8)
+    target = flat[header_bits.size:header_bits.size + values.size]
+    target[:] = (target & ((0xFF << bits_per_channel) & 0xFF)) | values
+
+def baseline_format(data):
+    return b"", f"{EXT}|||".encode() + base64.b64encode(data) + DELIMITER, 1
+
+def v1_format(data):
+    info = f"{EXT}|||".encode() + base64.b64encode(data)
+    return struct.pack(">4sBQ", b"STEG", 1, len(info)), info, 1
+
+def v2_format(data):
+    return PREFIX.pack(b"STEG", 2) + struct.pack(">QIB", len(data), zlib.crc32(data), len(EXT)) + EXT.encode(), \
+        data, 1
+
+def v3_format(data):
+    return PREFIX.pack(b"STEG", 3) + struct.pack(">BQIB", 2, len(data), zlib.crc32(data), len(EXT)) \
+        + EXT.encode(), data, 2
+
+def v4_format(data):
+    return PREFIX.pack(b"STEG", 4) + struct.pack(">BQIBQHH", 3, len(data), zlib.crc32(data), len(EXT),
+                                                 0x1234, 0, 1) + EXT.encode(), data, 3
+
+def v5_format(data):
+    stored = zlib.compress(data)
+    return PREFIX.pack(b"STEG", 5) + struct.pack(">BQIBQHHBQ", 2, len(stored), zlib.crc32(stored), len(EXT),
+                                                 0, 0, 1, 1, len(data)) + EXT.encode(), stored, 2
+
+FORMATS = {0: baseline_format, 1: v1_format, 2: v2_format, 3: v3_format, 4: v4_format, 5: v5_format}
+
+@pytest.fixture
+def payload():
+    return np.random.default_rng(4).integers(0, 256, size=3000, dtype=np.uint8).tobytes()
+
+@pytest.fixture(params=sorted(FORMATS))
+def stego(request, payload, tmp_path):
+    header, data, bits_per_channel = FORMATS[request.param](payload)
+    image = np.random.default_rng(5).integers(0, 256, size=(128, 128, 3), dtype=np.uint8)
+    embed(image, header, data, bits_per_channel)
+    path = tmp_path / f"v{request.param}.png"
+    cv2.imwrite(str(path), image)
+    return request.param, path
+
+def test_extract_data_from_image(stego, payload, tmp_path):
+    _, path = stego
+    output = SteganographyTool().extract_data_from_image(str(path), str(tmp_path / "recovered"))
+    assert output.endswith(EXT)
+    with open(output, 'rb') as file:
+        assert file.read() == payload
+
+def test_extract_bytes(stego, payload):
+    _, path = stego
+    assert SteganographyTool().extract_bytes(path.read_bytes()) == (payload, EXT)
+
+def test_probe_image(stego):
+    version, path = stego
+    found = SteganographyTool().probe_image(str(path))['payload']
+    assert found['version'] == version
+    # v1 keeps the extension inside the base64 payload, which probing does not read
+    assert found['ext'] == ('' if version == 1 else EXT)
+    assert found['format'] == {0: 'legacy-delimiter', 1: 'legacy-base64'}.get(version, 'stego')
+    if version >= 2:
+        assert found['fits']
+        assert found['codec'] == ('zlib' if version == 5 else 'none')
@@ -0,0 +1,75 @@
+import contextlib
+import io
+import re
+import cv2
+import numpy as np
+import pytest
+from steganography_frames import FrameSequence
+from steganography_tool import SteganographyTool
+
+FRAME_COUNT = 10
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(9)
+    return [rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8) for _ in range(FRAME_COUNT)]
+
+@pytest.fixture
+def payload(tmp_path):
+    # about three frames' worth at 1 bit per channel
+    path = tmp_path / "secret.bin"
+    path.write_bytes(np.random.default_rng(10).integers(0, 256, size=3000, dtype=np.uint8).tobytes())
+    return path
+
+def round_trip(cover, payload, output, tmp_path):
+    tool = SteganographyTool()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        tool.hide_data_in_frames(str(cover), str(payload), str(output))
+        recovered = tool.extract_data_from_frames(str(output), str(tmp_path / "recovered"))
+    with open(recovered, 'rb') as file:
+        assert file.read() == payload.read_bytes()
+    used, total = map(int, re.search(r"from (\d+) of (\d+) frames", stdout.getvalue()).groups())
+    assert total == FRAME_COUNT
+    assert used < total, "extraction should stop after the frames holding the payload"
+    return used
+
+def test_png_directory_round_trip_copies_untouched_frames(frames, payload, tmp_path):
+    cover = tmp_path / "cover"
+    cover.mkdir()
+    for index, frame in enumerate(frames):
+        cv2.imwrite(str(cover / f"img{index + 1}.png"), frame)
+    output = tmp_path / "stego"
+    used = round_trip(cover, payload, output, tmp_path)
+    names = [f"img{index + 1}.png" for index in range(FRAME_COUNT)]
+    assert sorted(path.name for path in output.iterdir()) == sorted(names)
+    for name in names[:used]:
+        assert (output / name).read_bytes() != (cover / name).read_bytes()
+    for name in names[used:]:
+        assert (output / name).read_bytes() == (cover / name).read_bytes()
+
+def test_multipage_tiff_round_trip(frames, payload, tmp_path):
+    pytest.importorskip("tifffile")
+    cover = tmp_path / "cover.tif"
+    cv2.imwritemulti(str(cover), frames)
+    output = tmp_path / "stego.tif"
+    used = round_trip(cover, payload, output, tmp_path)
+    written = list(FrameSequence(str(output)).frames())
+    assert len(written) == FRAME_COUNT
+    for original, stego in zip(frames[used:], written[used:]):
+        assert np.array_equal(original, stego)
+
+def test_ffv1_video_round_trip(frames, payload, tmp_path):
+    cover = tmp_path / "cover.mkv"
+    video = cv2.VideoWriter(str(cover), cv2.VideoWriter_fourcc(*'FFV1'), 25, (64, 48))
+    if not video.isOpened():
+        pytest.skip("OpenCV was built without an FFV1 encoder")
+    for frame in frames:
+        video.write(frame)
+    video.release()
+    output = tmp_path / "stego.mkv"
+    used = round_trip(cover, payload, output, tmp_path)
+    written = list(FrameSequence(str(output)).frames())
+    assert len(written) == FRAME_COUNT
+    for original, stego in zip(list(FrameSequence(str(cover)).frames())[used:], written[used:]):
+        assert np.array_equal(original, stego)
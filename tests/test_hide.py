@@ -0,0 +1,13 @@
+import cv2
+import numpy as np
+import pytest
+from steganography_tool import SteganographyTool
+
+def test_hide_data_in_image_raises_when_output_cannot_be_written(tmp_path):
+    cover_path, secret_path = tmp_path / "cover.png", tmp_path / "secret.txt"
+    cv2.imwrite(str(cover_path), np.zeros((32, 32, 3), dtype=np.uint8))
+    secret_path.write_bytes(b"hidden")
+    output_path = tmp_path / "missing" / "stego.png"
+    with pytest.raises(Exception, match="Could not write stego.png"):
+        SteganographyTool().hide_data_in_image(str(cover_path), str(secret_path), str(output_path))
+    assert not output_path.exists()
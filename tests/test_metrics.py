@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+import steganography_tool
+from steganography_tool import SteganographyTool, ssim_map
+
+@pytest.fixture
+def images(monkeypatch):
+    # small bands so the halo handling between bands is exercised
+    monkeypatch.setattr(steganography_tool, 'METRICS_BAND_SAMPLES', 40 * 90 * 3)
+    rng = np.random.default_rng(6)
+    original = rng.integers(0, 256, size=(301, 90, 3), dtype=np.uint8)
+    stego = original.copy()
+    stego[50:250] ^= rng.integers(0, 2, size=(200, 90, 3), dtype=np.uint8)
+    return original, stego
+
+def test_full_resolution_ssim_matches_whole_image_map(images):
+    original, stego = images
+    metrics = SteganographyTool().compute_quality_metrics(original, stego)
+    assert metrics['ssim_stride'] == 1
+    assert metrics['ssim'] == pytest.approx(float(ssim_map(original, stego).mean()), abs=1e-6)
+
+@pytest.mark.parametrize("stride", [2, 3])
+def test_strided_ssim_uses_the_strided_preview(images, stride):
+    original, stego = images
+    tool = SteganographyTool()
+    full = tool.compute_quality_metrics(original, stego)
+    strided = tool.compute_quality_metrics(original, stego, ssim_stride=stride)
+    expected = ssim_map(original[::stride, ::stride], stego[::stride, ::stride]).mean()
+    assert strided['ssim_stride'] == stride
+    assert strided['ssim'] == pytest.approx(float(expected), abs=1e-6)
+    for key in ('mse', 'psnr', 'changed_values', 'changed_lsbs'):
+        assert strided[key] == full[key]
@@ -0,0 +1,51 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+import cv2
+import numpy as np
+import pytest
+from steganography_service import SteganographyService
+
+@pytest.fixture
+def service():
+    service = SteganographyService(workers=1)
+    ports = []
+    threading.Thread(target=lambda: asyncio.run(service.serve(0, ports.append)), daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not ports and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert ports, "service did not start"
+    return service, ports[0]
+
+def post(port: int, path: str, body: bytes):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request("POST", path, body=body)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+def cover_png():
+    return cv2.imencode('.png', np.zeros((16, 16, 3), dtype=np.uint8))[1].tobytes()
+
+def test_capacity_rejects_long_extension(service):
+    _, port = service
+    status, content = post(port, "/capacity?ext=." + "x" * 300, cover_png())
+    assert status == 400
+    assert "too long" in json.loads(content)['error']
+
+def test_unexpected_handler_error_answers_500_and_is_counted(service):
+    service, port = service
+
+    async def broken(query, headers, body):
+        raise RuntimeError("boom")
+
+    service.routes['/capacity'] = ('POST', broken)
+    status, content = post(port, "/capacity", cover_png())
+    assert status == 500
+    assert json.loads(content) == {'error': "boom"}
+    # counters are updated just after the response is flushed
+    deadline = time.monotonic() + 5
+    while ('capacity', 500) not in service.responses and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service.responses[('capacity', 500)] == 1
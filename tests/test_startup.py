@@ -0,0 +1,35 @@
+import subprocess
+import sys
+import cv2
+import numpy as np
+import pytest
+from steganography_bench import CLI_PATH, GUI_MODULES, HEAVY_MODULES, check_startup, parse_importtime
+
+def imported_modules(*args):
+    process = subprocess.run([sys.executable, '-X', 'importtime', CLI_PATH] + list(args),
+                             capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr[-500:]
+    return parse_importtime(process.stderr)[1]
+
+@pytest.mark.parametrize("args", [["--help"], ["hide", "--help"], ["bench", "--help"]])
+def test_help_does_not_import_heavy_modules(args):
+    modules = imported_modules(*args)
+    assert [module for module in HEAVY_MODULES if module in modules] == []
+
+def test_small_hide_does_not_import_gui_modules(tmp_path):
+    cover_path, secret_path = tmp_path / "cover.png", tmp_path / "secret.txt"
+    cv2.imwrite(str(cover_path), np.zeros((32, 32, 3), dtype=np.uint8))
+    secret_path.write_text("startup check\n")
+    modules = imported_modules("hide", str(cover_path), str(secret_path), str(tmp_path / "stego.png"))
+    assert 'cv2' in modules
+    assert [module for module in GUI_MODULES if module in modules] == []
+
+def test_check_startup_budgets_and_baseline():
+    results = {'startup': [{'case': 'help', 'import_time': 0.05, 'heavy': []},
+                           {'case': 'hide', 'import_time': 0.3, 'heavy': ['cv2', 'numpy', 'matplotlib']}]}
+    assert check_startup(results) == ["hide: imported matplotlib"]
+    assert len(check_startup(results, budgets={'help': 0.04})) == 2
+    baseline = {'startup': [{'case': 'help', 'import_time': 0.04}, {'case': 'hide', 'import_time': 0.29}]}
+    failures = check_startup(results, baseline=baseline, tolerance=0.15)
+    assert failures[0].startswith("help: imports took 50.0 ms, baseline 40.0 ms")
+    assert len(failures) == 2